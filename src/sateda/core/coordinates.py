@@ -1,7 +1,13 @@
+import logging
+from typing import Union
+
 import erfa as erfa
 import numpy as np
 
-from sateda.core.time import Time, TimeSystem
+from sateda.core import interp
+from sateda.core.time import Time, TimeArray, TimeSystem
+
+logger = logging.getLogger(__name__)
 
 DX06 = 0.1750e-3 / 3600 * np.pi / 180
 DY06 = -0.2259e-3 / 3600 * np.pi / 180
@@ -11,7 +17,10 @@ DY00 = -0.2650e-3 / 3600 * np.pi / 180
 
 
 class Eop:
-    def __init__(self, time: Time) -> None:
+    def __init__(self, time: Union[Time, TimeArray]) -> None:
+        """
+        :param time: epoch, or TimeArray to compute the parameters and rotations of all its epochs at once
+        """
         self.xp = 0
         self.yp = 0
         self.dut1 = 0
@@ -26,25 +35,37 @@ class Eop:
         self.gast = 0
         self.time = time
 
-    def iau2000(self):
-        self.X, self.Y, self.s = erfa.xys00a(*self.time.to_tt().to_jd())
+    def iau2000(self, cache: "XysCache" = None):
+        """
+        :param cache: XysCache of the iau2000 model to interpolate X, Y, s instead of evaluating the full series
+        """
+        tt = self.time.to_tt().to_jd()
+        self.X, self.Y, self.s = cache.xys(*tt) if cache else erfa.xys00a(*tt)
         self.X += DX00
         self.Y += DY00
-        ut1, ut2 = self.time.to_utc().to_jd()
-        ut2 += self.ut1_utc / 86400
-        self.era = erfa.era00(ut1, ut2)
+        self.era = self._era()
         self.iau_rotations()
 
-    def iau2006(self):
-        self.X, self.Y = erfa.xy06(*self.time.to_tt().to_jd())
-        self.s = erfa.s06(*self.time.to_tt().to_jd(), self.X, self.Y)
+    def iau2006(self, cache: "XysCache" = None):
+        """
+        :param cache: XysCache of the iau2006 model to interpolate X, Y, s instead of evaluating the full series
+        """
+        tt = self.time.to_tt().to_jd()
+        if cache:
+            self.X, self.Y, self.s = cache.xys(*tt)
+        else:
+            self.X, self.Y = erfa.xy06(*tt)
+            self.s = erfa.s06(*tt, self.X, self.Y)
         self.X += DX06
         self.Y += DY06
-        ut1, ut2 = self.time.to_utc().to_jd()
-        ut2 += self.ut1_utc / 86400
-        self.era = erfa.era00(ut1, ut2)
+        self.era = self._era()
         self.iau_rotations()
 
+    def _era(self):
+        # the two-part julian dates are memoized by the time, so they are not modified in place
+        ut1, ut2 = self.time.to_utc().to_jd()
+        return erfa.era00(ut1, ut2 + self.ut1_utc / 86400)
+
     def iau_rotations(self):
         r2ci = erfa.c2ixys(self.X, self.Y, self.s)
         rc2ti = erfa.cr(r2ci)
@@ -53,20 +74,176 @@ class Eop:
         self.rot = erfa.rxr(rpom, rc2ti)
 
     def generate_rotation(self) -> np.array:
-        # c2ixuz
+        # c2ixys, for one epoch (3, 3) or all the epochs of a TimeArray (N, 3, 3)
         r2 = self.X * self.X + self.Y * self.Y
-        e = np.arctan2(self.Y, self.X) if r2 > 0 else 0
+        e = np.where(r2 > 0, np.arctan2(self.Y, self.X), 0.0)
         d = np.arctan(np.sqrt(r2 / (1 - r2)))
-
-        rc2i = np.eye(3)
-        rc2i = rc2i @ self._rz(e)
-        rc2i = rc2i @ self._ry(d)
-        rc2i = rc2i @ self._rz(-(e + self.s))
-        # print(rc2i)
-        return rc2i
+        return self._rz(-(e + self.s)) @ self._ry(d) @ self._rz(e)
 
     def _rz(self, angle: float) -> np.array:
-        return np.array([[np.cos(angle), np.sin(angle), 0], [-np.sin(angle), np.cos(angle), 0], [0, 0, 1]])
+        return rotation_z(angle)
 
     def _ry(self, angle: float) -> np.array:
-        return np.array([[np.cos(angle), 0, -np.sin(angle)], [0, 1, 0], [np.sin(angle), 0, np.cos(angle)]])
+        return rotation_y(angle)
+
+
+def rotation_z(angle: np.ndarray) -> np.ndarray:
+    """
+    Rotation matrices about the z axis, (..., 3, 3) for angles of shape (...).
+    """
+    angle = np.asarray(angle, dtype=np.float64)
+    cos, sin = np.cos(angle), np.sin(angle)
+    matrix = np.zeros(angle.shape + (3, 3))
+    matrix[..., 0, 0] = cos
+    matrix[..., 0, 1] = sin
+    matrix[..., 1, 0] = -sin
+    matrix[..., 1, 1] = cos
+    matrix[..., 2, 2] = 1.0
+    return matrix
+
+
+def rotation_y(angle: np.ndarray) -> np.ndarray:
+    """
+    Rotation matrices about the y axis, (..., 3, 3) for angles of shape (...).
+    """
+    angle = np.asarray(angle, dtype=np.float64)
+    cos, sin = np.cos(angle), np.sin(angle)
+    matrix = np.zeros(angle.shape + (3, 3))
+    matrix[..., 0, 0] = cos
+    matrix[..., 0, 2] = -sin
+    matrix[..., 1, 1] = 1.0
+    matrix[..., 2, 0] = sin
+    matrix[..., 2, 2] = cos
+    return matrix
+
+
+def c2t_matrix(
+    time: Union[Time, TimeArray],
+    xp: np.ndarray = 0.0,
+    yp: np.ndarray = 0.0,
+    ut1_utc: np.ndarray = 0.0,
+    model: str = "iau2006",
+    cache: "XysCache" = None,
+) -> np.ndarray:
+    """
+    Celestial (GCRS) to terrestrial (ITRS) rotation matrices of all the epochs at once.
+    The erfa routines broadcast over the epochs, so a full day of orbit epochs is a handful of vectorized calls.
+
+    :param time: epochs
+    :param xp: polar motion x (radians), scalar or one value per epoch
+    :param yp: polar motion y (radians), scalar or one value per epoch
+    :param ut1_utc: UT1 - UTC (seconds), scalar or one value per epoch
+    :param model: "iau2006" or "iau2000"
+    :param cache: XysCache of the same model, for long series of epochs
+    :return: (N, 3, 3) matrices for a TimeArray, (3, 3) for a Time
+    """
+    if model not in ("iau2000", "iau2006"):
+        raise ValueError(f"Unknown precession-nutation model {model}")
+    eop = Eop(time)
+    eop.xp = xp
+    eop.yp = yp
+    eop.ut1_utc = ut1_utc
+    getattr(eop, model)(cache)
+    return eop.rot
+
+
+class XysCache:
+    """
+    Cache of the CIP coordinates X, Y and CIO locator s.
+    The full precession-nutation series are evaluated on a coarse grid of TT (step seconds), one day at a time, and
+    interpolated to the epochs with a Lagrange window of order points. X, Y and s vary slowly, so an hourly grid
+    is far below the microarcsecond while the series are only evaluated 24 times a day.
+
+    The step is checked against the direct evaluation on the first day computed, and halved until the interpolation
+    error is below tolerance (radians).
+    """
+
+    def __init__(self, model: str = "iau2006", step: float = 3600.0, order: int = 8, tolerance: float = 1e-12) -> None:
+        if model not in _XYS_SERIES:
+            raise ValueError(f"Unknown precession-nutation model {model}")
+        self.model = model
+        self.step = step
+        self.order = order
+        self.tolerance = tolerance
+        self._days = {}
+        self._checked = False
+
+    def xys(self, jd1: np.ndarray, jd2: np.ndarray) -> tuple:
+        """
+        X, Y, s at the TT two-part julian dates, same interface as erfa.xys00a.
+        """
+        shape = np.broadcast(jd1, jd2).shape
+        jd1, jd2 = (np.broadcast_to(value, shape).ravel() for value in (jd1, jd2))
+        # days since J2000 split into day number and fraction of the day
+        days = (jd1 - erfa.DJ00) + jd2
+        day = np.floor(days)
+        fraction = (jd1 - erfa.DJ00 - day) + jd2
+        # epochs sorted by day (usually already), the epochs of each day are a slice found by one searchsorted
+        day = day.astype(np.int64)
+        ordered = np.all(day[1:] >= day[:-1])
+        index = np.arange(len(day)) if ordered else np.argsort(day, kind="stable")
+        sorted_day = day[index]
+        unique_days = np.unique(sorted_day)
+        if not self._checked and len(unique_days):
+            self._check_step(unique_days[0])
+        bounds = np.searchsorted(sorted_day, np.append(unique_days, np.iinfo(np.int64).max))
+        result = np.empty((len(days), 3))
+        for key, start, end in zip(unique_days, bounds[:-1], bounds[1:]):
+            on_day = index[start:end]
+            grid, values = self._day(key)
+            result[on_day] = interp.lagrange_interpolate(grid, values, fraction[on_day], self.order)
+        return tuple(result[:, k].reshape(shape) for k in range(3))
+
+    def _day(self, day: int) -> tuple:
+        """
+        Grid (fraction of day) and X, Y, s of a day, with a margin of half a window on each side.
+        """
+        if day not in self._days:
+            step = self.step / 86400
+            margin = self.order // 2 + 1
+            grid = np.arange(-margin, int(np.ceil(1 / step)) + margin + 1) * step
+            values = np.column_stack(_XYS_SERIES[self.model](erfa.DJ00 + day, grid))
+            self._days[day] = (grid, values)
+        return self._days[day]
+
+    def _check_step(self, day: int) -> None:
+        for _ in range(10):
+            grid, values = self._day(day)
+            # the middle of the grid intervals covering the day are the furthest from the nodes
+            margin = self.order // 2 + 1
+            middle = ((grid[:-1] + grid[1:]) / 2)[margin - 1 : len(grid) - margin]
+            expected = np.column_stack(_XYS_SERIES[self.model](erfa.DJ00 + day, middle))
+            error = np.max(np.abs(interp.lagrange_interpolate(grid, values, middle, self.order) - expected))
+            if error <= self.tolerance:
+                break
+            logger.debug(f"X, Y, s interpolation error {error} above the tolerance, using a step of {self.step / 2} s")
+            self.step /= 2
+            self._days = {}
+        self._checked = True
+
+
+def _xys06(jd1: np.ndarray, jd2: np.ndarray) -> tuple:
+    # same series as Eop.iau2006
+    x, y = erfa.xy06(jd1, jd2)
+    return x, y, erfa.s06(jd1, jd2, x, y)
+
+
+_XYS_SERIES = {"iau2000": erfa.xys00a, "iau2006": _xys06}
+
+
+if __name__ == "__main__":
+    # Validation of the X, Y, s cache against the direct erfa evaluation, on one day at a 1 s sampling.
+    import time
+
+    logging.basicConfig(level=logging.DEBUG)
+    epochs = TimeArray(np.datetime64("2023-06-01", "ns") + np.arange(86400) * np.timedelta64(1, "s"))
+    tt = epochs.to_tt().to_jd()
+    for model in _XYS_SERIES:
+        start = time.perf_counter()
+        direct = _XYS_SERIES[model](*tt)
+        direct_time = time.perf_counter() - start
+        start = time.perf_counter()
+        cached = XysCache(model).xys(*tt)
+        cached_time = time.perf_counter() - start
+        error = max(np.max(np.abs(a - b)) for a, b in zip(direct, cached))
+        print(f"{model}: direct {direct_time:.3f} s, cached {cached_time:.3f} s, max error {error:.2e} rad")
@@ -0,0 +1,66 @@
+"""
+Sliding window Lagrange interpolation, in the barycentric form.
+
+The weights only depend on the sampling grid and the interpolation times, so they are computed once and applied to
+any number of series sampled on the same grid (e.g. all the satellites of a sp3 file) with a single product.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+
+def lagrange_weights(grid: npt.ArrayLike, targets: npt.ArrayLike, order: int = 10) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Interpolation weights of a sliding window of order points of the grid, centred on each target.
+    Targets outside of the grid get NaN weights (no extrapolation).
+
+    :param grid: increasing sampling times (float)
+    :param targets: interpolation times (float)
+    :param order: number of points of the window (degree + 1)
+    :return: index (N, order) of the points of the grid used by each target and their weights (N, order)
+    """
+    grid = np.asarray(grid, dtype=np.float64)
+    targets = np.atleast_1d(np.asarray(targets, dtype=np.float64))
+    order = min(order, len(grid))
+    if order < 1:
+        raise ValueError("Cannot interpolate on an empty grid")
+    start = np.clip(np.searchsorted(grid, targets) - order // 2, 0, len(grid) - order)
+    index = start[:, np.newaxis] + np.arange(order)
+    nodes = grid[index]
+    # barycentric weights of the window: 1 / prod_{k != j} (x_j - x_k)
+    differences = nodes[:, :, np.newaxis] - nodes[:, np.newaxis, :]
+    differences[:, np.arange(order), np.arange(order)] = 1.0
+    barycentric = 1.0 / np.prod(differences, axis=2)
+
+    offset = targets[:, np.newaxis] - nodes
+    exact = offset == 0
+    offset[exact] = 1.0
+    weights = barycentric / offset
+    weights /= weights.sum(axis=1, keepdims=True)
+    on_node = np.any(exact, axis=1)
+    weights[on_node] = exact[on_node]
+    weights[(targets < grid[0]) | (targets > grid[-1])] = np.nan
+    return index, weights
+
+
+def lagrange_interpolate(
+    grid: npt.ArrayLike, values: npt.ArrayLike, targets: npt.ArrayLike, order: int = 10
+) -> np.ndarray:
+    """
+    Interpolate values sampled on the grid, see lagrange_weights.
+
+    :param values: (len(grid), ...) array, every trailing column is interpolated with the same weights
+    :return: (len(targets), ...) array
+    """
+    index, weights = lagrange_weights(grid, targets, order)
+    return apply_weights(index, weights, values)
+
+
+def apply_weights(index: np.ndarray, weights: np.ndarray, values: npt.ArrayLike) -> np.ndarray:
+    """
+    Apply the weights of lagrange_weights to values (len(grid), ...).
+    """
+    values = np.asarray(values)
+    return np.einsum("nk,nk...->n...", weights, values[index])
@@ -1,10 +1,134 @@
+import copy
+import functools
 import logging
 
 import numpy as np
+import numpy.typing as npt
 import enum
 
 logger = logging.getLogger(__name__)
 
+# TAI - UTC from the date (UTC) it applies, see IERS Bulletin C
+LEAP_SECONDS = [
+    ("1972-01-01", 10),
+    ("1972-07-01", 11),
+    ("1973-01-01", 12),
+    ("1974-01-01", 13),
+    ("1975-01-01", 14),
+    ("1976-01-01", 15),
+    ("1977-01-01", 16),
+    ("1978-01-01", 17),
+    ("1979-01-01", 18),
+    ("1980-01-01", 19),
+    ("1981-07-01", 20),
+    ("1982-07-01", 21),
+    ("1983-07-01", 22),
+    ("1985-07-01", 23),
+    ("1988-01-01", 24),
+    ("1990-01-01", 25),
+    ("1991-01-01", 26),
+    ("1992-07-01", 27),
+    ("1993-07-01", 28),
+    ("1994-07-01", 29),
+    ("1996-01-01", 30),
+    ("1997-07-01", 31),
+    ("1999-01-01", 32),
+    ("2006-01-01", 33),
+    ("2009-01-01", 34),
+    ("2012-07-01", 35),
+    ("2015-07-01", 36),
+    ("2017-01-01", 37),
+]
+
+# NTP timestamps (leap-seconds.list) count the seconds since 1900-01-01
+_NTP_EPOCH = np.datetime64("1900-01-01", "s")
+
+
+class LeapSecondTable:
+    """
+    Table of the TAI - UTC offsets, looked up with a binary search so arrays spanning several leap seconds are
+    converted at once. Epochs before 1972 get the 1972 offset.
+    """
+
+    def __init__(self, dates: npt.ArrayLike, offsets: npt.ArrayLike) -> None:
+        """
+        :param dates: UTC dates from which the offsets apply, increasing
+        :param offsets: TAI - UTC in seconds
+        """
+        self.dates = np.asarray(dates, dtype="datetime64[ns]")
+        self.offsets = np.asarray(offsets, dtype="timedelta64[s]").astype("timedelta64[ns]")
+        # same dates in TAI, to look up TAI (or GPS, TT) epochs
+        self.tai_dates = self.dates + self.offsets
+
+    @classmethod
+    def from_file(cls, filename: str) -> "LeapSecondTable":
+        """
+        Read the IERS Leap_Second.dat (MJD, day, month, year, TAI - UTC) or the leap-seconds.list (NTP seconds,
+        TAI - UTC) file. Lines starting with # are comments.
+        """
+        dates = []
+        offsets = []
+        with open(filename, "r") as f:
+            for line in f:
+                fields = line.split("#")[0].split()
+                if not fields:
+                    continue
+                if len(fields) >= 5:
+                    dates.append(np.datetime64(f"{int(fields[3]):04d}-{int(fields[2]):02d}-{int(fields[1]):02d}"))
+                else:
+                    dates.append(_NTP_EPOCH + np.timedelta64(int(fields[0]), "s"))
+                offsets.append(int(float(fields[-1])))
+        if not dates:
+            raise ValueError(f"No leap second found in {filename}")
+        return cls(dates, offsets)
+
+    def tai_minus_utc(self, utc: npt.ArrayLike) -> np.ndarray:
+        """
+        TAI - UTC (timedelta64[ns]) at UTC epochs.
+        """
+        return self._lookup(self.dates, utc)
+
+    def tai_minus_utc_from_tai(self, tai: npt.ArrayLike) -> np.ndarray:
+        """
+        TAI - UTC (timedelta64[ns]) at TAI epochs.
+        """
+        return self._lookup(self.tai_dates, tai)
+
+    def _lookup(self, dates: np.ndarray, time: npt.ArrayLike) -> np.ndarray:
+        dates = dates.view(np.int64)
+        time = _as_int64(time)
+        # the offset before the first date is the first one
+        offsets = np.concatenate([self.offsets[:1], self.offsets])
+        if time.ndim == 1 and len(time) > len(dates) and np.all(time[1:] >= time[:-1]):
+            # sorted epochs: locate the few dates in the epochs rather than every epoch in the dates
+            starts = np.searchsorted(time, dates, side="left")
+            return np.repeat(offsets, np.diff(starts, prepend=0, append=len(time)))
+        return offsets[np.searchsorted(dates, time, side="right")]
+
+
+def _as_int64(time: npt.ArrayLike) -> np.ndarray:
+    # searchsorted is much faster on int64 than on datetime64
+    return np.asarray(time, dtype="datetime64[ns]").view(np.int64)
+
+
+_leap_second_table = LeapSecondTable(*zip(*LEAP_SECONDS))
+
+
+def get_leap_second_table() -> LeapSecondTable:
+    """
+    Table used by Time and TimeArray, the bundled LEAP_SECONDS unless updated with load_leap_second_table.
+    """
+    return _leap_second_table
+
+
+def load_leap_second_table(filename: str) -> LeapSecondTable:
+    """
+    Refresh the table used by Time and TimeArray from a local copy of Leap_Second.dat or leap-seconds.list.
+    """
+    global _leap_second_table
+    _leap_second_table = LeapSecondTable.from_file(filename)
+    return _leap_second_table
+
 
 class TimeSystem(enum.Enum):
     """Enum for time systems"""
@@ -16,15 +140,66 @@ class TimeSystem(enum.Enum):
     UNKNOWN = None
 
 
-class Time:
+def _memoized(method):
+    """
+    Cache the result of a conversion until the time or the time system of the object changes.
+    A converted Time or TimeArray is returned as a new object on each call, sharing the read-only time buffer and the
+    conversions of the cached one, so a caller changing it does not change the cache.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self):
+        if method.__name__ not in self._cache:
+            value = method(self)
+            if isinstance(value, _MemoizedTime) and isinstance(value.time, np.ndarray):
+                value.time.flags.writeable = False
+            self._cache[method.__name__] = value
+        value = self._cache[method.__name__]
+        if isinstance(value, _MemoizedTime):
+            value = copy.copy(value)
+        return value
+
+    return wrapper
+
+
+class _MemoizedTime:
+    _cache: dict
+
+    def __setattr__(self, name, value):
+        if name in ("time", "timesystem"):
+            super().__setattr__("_cache", {})
+        super().__setattr__(name, value)
+
+
+def _two_part_mjd(time: np.ndarray) -> tuple:
+    """
+    MJD of datetime64 epochs as day number and fraction of the day (float), computed on the integer nanoseconds
+    so the fraction keeps the full resolution.
+    """
+    time = np.asarray(time, dtype="datetime64[ns]")
+    days = time.astype("datetime64[D]")
+    fraction = (time - days).astype(np.int64) / 86400e9
+    return (days.astype(np.int64) + _MJD_UNIX_EPOCH).astype(np.float64), fraction
+
+
+def _read_only(values: tuple) -> tuple:
+    # the memoized arrays are shared by all the callers
+    for value in values:
+        if isinstance(value, np.ndarray):
+            value.flags.writeable = False
+    return values
+
+
+class Time(_MemoizedTime):
     """
     Class for time handling
+    The conversions to other time systems and the two-part MJD/JD are memoized, so repeated calls (e.g. in Eop) are
+    computed once.
     @todo Extend to handle different time systems and leap seconds
     """
 
     def __init__(self, dt64=np.datetime64("1970-01-01T00:00:00"), timesystem=TimeSystem.GPS):
         self.timesystem = timesystem
-        self.leapsec = 33
         self.time = dt64
 
         self._convert_to_gps()
@@ -64,6 +239,17 @@ class Time:
     def __repr__(self):
         return f"{self.time} {self.timesystem.value}"
 
+    @property
+    def leapsec(self) -> int:
+        """
+        TAI - UTC in seconds at this epoch.
+        """
+        if self.timesystem == TimeSystem.UTC:
+            offset = get_leap_second_table().tai_minus_utc(self.time)
+        else:
+            offset = get_leap_second_table().tai_minus_utc_from_tai(self.to_tai().time)
+        return int(offset / np.timedelta64(1, "s"))
+
     def _convert_to_gps(self):
         if self.timesystem == TimeSystem.UTC:
             self.time += np.timedelta64(self.leapsec - 19, "s")
@@ -73,7 +259,7 @@ class Time:
 
     def _convert_from_gps(self):
         if self.timesystem == TimeSystem.UTC:
-            self.time -= np.timedelta64(18, "s")
+            self.time -= np.timedelta64(self.leapsec - 19, "s")
         elif self.timesystem == TimeSystem.TAI:
             self.time += np.timedelta64(19, "s")
         elif self.timesystem == TimeSystem.TT:
@@ -81,41 +267,241 @@ class Time:
         else:
             logger.debug("Time system is not known, no conversion is done")
 
+    @_memoized
     def to_utc(self):
         new_time = Time()
         new_time.time = self.time - np.timedelta64(self.leapsec - 19, "s")
         new_time.timesystem = TimeSystem.UTC
         return new_time
 
+    @_memoized
     def to_tai(self):
         new_time = Time()
         new_time.time = self.time + np.timedelta64(19, "s")
         new_time.timesystem = TimeSystem.TAI
         return new_time
 
+    @_memoized
     def to_tt(self):
         new_time = Time()
         new_time.time = self.time + np.timedelta64(19, "s") + np.timedelta64(32184, "ms")
         new_time.timesystem = TimeSystem.TT
         return new_time
 
+    @_memoized
     def to_mjd(self):
-        # compute the mjd in 2 parts, first the integer part, then the fractional part
-        mjd_int = self._compute_mjd_int()
-        mjd_frac = self._compute_mjd_frac()
-        return (mjd_int, mjd_frac)
-        # return (self.time - np.datetime64('1858-11-17T00:00:00')) / np.timedelta64(1, 'D')
-
-    def _compute_mjd_int(self):
-        return np.floor((self.time - np.datetime64("1858-11-17T00:00:00")) / np.timedelta64(1, "D"))
-
-    def _compute_mjd_frac(self):
-        seconds_of_day = (
-            (self.time - np.datetime64(self.time.astype("datetime64[D]"))).astype("timedelta64[ns]").astype(int)
-        )
-        print(seconds_of_day / 1e9)
-        return seconds_of_day / 86400e9
+        """
+        Two-part MJD: day number and fraction of the day.
+        """
+        mjd, mjd_f = _two_part_mjd(self.time)
+        return (mjd[()], mjd_f[()])
 
+    @_memoized
     def to_jd(self):
         mjd, mjd_f = self.to_mjd()
         return mjd + 2400000.5, mjd_f
+
+
+# offsets of the time systems to TAI
+_TAI_OFFSETS = {
+    TimeSystem.GPS: np.timedelta64(19, "s"),
+    TimeSystem.TAI: np.timedelta64(0, "s"),
+    TimeSystem.TT: np.timedelta64(-32184, "ms"),
+}
+
+# MJD of 1970-01-01, the origin of datetime64
+_MJD_UNIX_EPOCH = 40587
+
+GPS_EPOCH = np.datetime64("1980-01-06T00:00:00", "ns")
+J2000_EPOCH = np.datetime64("2000-01-01T12:00:00", "ns")
+_SECONDS_PER_WEEK = 604800
+_NANOSECONDS = 1_000_000_000
+
+
+def _seconds_to_timedelta(seconds: npt.ArrayLike) -> np.ndarray:
+    """
+    Float seconds to timedelta64[ns], converting the whole and fractional parts separately so large values
+    (e.g. seconds since J2000) keep the nanosecond resolution.
+    """
+    seconds = np.asarray(seconds, dtype=np.float64)
+    whole = np.floor(seconds)
+    nanoseconds = whole.astype(np.int64) * _NANOSECONDS + np.round((seconds - whole) * 1e9).astype(np.int64)
+    return nanoseconds.astype("timedelta64[ns]")
+
+
+def _timedelta_to_seconds(delta: np.ndarray) -> np.ndarray:
+    nanoseconds = delta.astype("timedelta64[ns]").astype(np.int64)
+    return (nanoseconds // _NANOSECONDS).astype(np.float64) + (nanoseconds % _NANOSECONDS) / 1e9
+
+
+class TimeArray(_MemoizedTime):
+    """
+    Array of epochs in one time system, stored as a contiguous datetime64[ns] buffer.
+    Conversions between time systems and to MJD/JD are done on the whole array at once, with the same interface as
+    Time (to_utc, to_tt, to_jd...) so it can be used in place of it, e.g. by Eop.
+    """
+
+    def __init__(self, time: npt.ArrayLike = (), timesystem: TimeSystem = TimeSystem.GPS) -> None:
+        self.time = np.ascontiguousarray(time, dtype="datetime64[ns]")
+        self.timesystem = timesystem
+
+    @classmethod
+    def from_times(cls, times: list) -> "TimeArray":
+        """
+        Build from a list of Time, converted to the time system of the first one.
+        """
+        if not times:
+            return cls()
+        timesystem = times[0].timesystem
+        values = np.array([time.time for time in times], dtype="datetime64[ns]")
+        systems = np.array([time.timesystem.name for time in times])
+        for name in np.unique(systems):
+            if name != timesystem.name:
+                other = systems == name
+                values[other] = cls(values[other], TimeSystem[name]).to_system(timesystem).time
+        return cls(values, timesystem)
+
+    @classmethod
+    def from_gps_week(
+        cls, week: npt.ArrayLike, seconds_of_week: npt.ArrayLike, timesystem: TimeSystem = TimeSystem.GPS
+    ) -> "TimeArray":
+        """
+        Build from GPS weeks and seconds of week.
+        """
+        weeks = np.asarray(week, dtype=np.int64) * np.timedelta64(_SECONDS_PER_WEEK, "s")
+        return cls(GPS_EPOCH + weeks + _seconds_to_timedelta(seconds_of_week), timesystem)
+
+    @classmethod
+    def from_yds(
+        cls, year: npt.ArrayLike, day_of_year: npt.ArrayLike, seconds_of_day: npt.ArrayLike, timesystem=TimeSystem.GPS
+    ) -> "TimeArray":
+        """
+        Build from year, day of year and seconds of day (e.g. the SINEX YYYY:DOY:SOD dates). Year 0 gives NaT.
+        """
+        year = np.asarray(year, dtype=np.int64)
+        days = (year - 1970).astype("datetime64[Y]").astype("datetime64[D]")
+        days = days + np.asarray(day_of_year, dtype=np.int64) - 1
+        time = days.astype("datetime64[ns]") + _seconds_to_timedelta(seconds_of_day)
+        return cls(np.where(year == 0, np.datetime64("NaT"), time), timesystem)
+
+    @classmethod
+    def from_j2000_seconds(cls, seconds: npt.ArrayLike, timesystem: TimeSystem = TimeSystem.GPS) -> "TimeArray":
+        """
+        Build from seconds since J2000 (2000-01-01 12:00:00), e.g. the GRACE time tags.
+        """
+        return cls(J2000_EPOCH + _seconds_to_timedelta(seconds), timesystem)
+
+    @classmethod
+    def from_mjd(
+        cls, mjd: npt.ArrayLike, fraction: npt.ArrayLike = 0.0, timesystem: TimeSystem = TimeSystem.GPS
+    ) -> "TimeArray":
+        """
+        Build from (two-part) MJD.
+        """
+        mjd = np.asarray(mjd, dtype=np.float64)
+        day = np.floor(mjd)
+        days = (day.astype(np.int64) - _MJD_UNIX_EPOCH).astype("datetime64[D]")
+        return cls(days.astype("datetime64[ns]") + _seconds_to_timedelta((mjd - day + fraction) * 86400), timesystem)
+
+    def to_gps_week(self) -> tuple:
+        """
+        GPS weeks (int) and seconds of week (float).
+        """
+        nanoseconds = (self.time - GPS_EPOCH).astype(np.int64)
+        week, remainder = np.divmod(nanoseconds, _SECONDS_PER_WEEK * _NANOSECONDS)
+        return week, _timedelta_to_seconds(remainder.astype("timedelta64[ns]"))
+
+    def to_yds(self) -> tuple:
+        """
+        Years, days of year (int) and seconds of day (float).
+        """
+        years = self.time.astype("datetime64[Y]")
+        days = self.time.astype("datetime64[D]")
+        return (
+            years.astype(np.int64) + 1970,
+            (days - years.astype("datetime64[D]")).astype(np.int64) + 1,
+            _timedelta_to_seconds(self.time - days),
+        )
+
+    def format_yds(self) -> np.ndarray:
+        """
+        SINEX dates "YYYY:DOY:SSSSS", "0000:000:00000" for NaT.
+        """
+        year, doy, sod = self.to_yds()
+        text = np.char.add(np.char.add(np.char.zfill(year.astype(str), 4), ":"), np.char.zfill(doy.astype(str), 3))
+        text = np.char.add(np.char.add(text, ":"), np.char.zfill(np.floor(sod).astype(np.int64).astype(str), 5))
+        return np.where(np.isnat(self.time), "0000:000:00000", text)
+
+    def to_j2000_seconds(self) -> np.ndarray:
+        """
+        Seconds since J2000 (2000-01-01 12:00:00).
+        """
+        return _timedelta_to_seconds(self.time - J2000_EPOCH)
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getitem__(self, index) -> "TimeArray":
+        return TimeArray(self.time[index], self.timesystem)
+
+    def __eq__(self, other):
+        if isinstance(other, TimeArray):
+            return self.to_system(TimeSystem.TAI).time == other.to_system(TimeSystem.TAI).time
+        return self.time == other
+
+    def __repr__(self):
+        return f"TimeArray({self.time}, {self.timesystem.value})"
+
+    def _tai_offset(self) -> np.ndarray:
+        """
+        TAI - time, for every epoch of the array (a scalar for the systems with a constant offset).
+        """
+        if self.timesystem == TimeSystem.UTC:
+            return get_leap_second_table().tai_minus_utc(self.time)
+        if self.timesystem not in _TAI_OFFSETS:
+            raise ValueError(f"Unknown time system {self.timesystem}")
+        return _TAI_OFFSETS[self.timesystem].astype("timedelta64[ns]")
+
+    def to_system(self, timesystem: TimeSystem) -> "TimeArray":
+        """
+        Convert to another time system.
+        """
+        if timesystem == self.timesystem:
+            # a new buffer: the memoized conversions are read-only and must not freeze the time of this array
+            return TimeArray(self.time.copy(), timesystem)
+        tai = TimeArray(self.time + self._tai_offset(), TimeSystem.TAI)
+        if timesystem == TimeSystem.TAI:
+            return tai
+        if timesystem == TimeSystem.UTC:
+            return TimeArray(tai.time - get_leap_second_table().tai_minus_utc_from_tai(tai.time), timesystem)
+        converted = TimeArray(tai.time, timesystem)
+        converted.time = tai.time - converted._tai_offset()
+        return converted
+
+    @_memoized
+    def to_gps(self) -> "TimeArray":
+        return self.to_system(TimeSystem.GPS)
+
+    @_memoized
+    def to_utc(self) -> "TimeArray":
+        return self.to_system(TimeSystem.UTC)
+
+    @_memoized
+    def to_tai(self) -> "TimeArray":
+        return self.to_system(TimeSystem.TAI)
+
+    @_memoized
+    def to_tt(self) -> "TimeArray":
+        return self.to_system(TimeSystem.TT)
+
+    @_memoized
+    def to_mjd(self) -> tuple:
+        """
+        Two-part MJD: day number and fraction of the day, both read-only float arrays.
+        """
+        return _read_only(_two_part_mjd(self.time))
+
+    @_memoized
+    def to_jd(self) -> tuple:
+        mjd, mjd_f = self.to_mjd()
+        return _read_only((mjd + 2400000.5, mjd_f))
@@ -5,7 +5,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import numpy.typing as npt
 
-from sateda.data.measurements import MeasurementArray, Measurements
+from sateda.data.measurements import MeasurementArray, Measurements, identifier_key
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -40,8 +40,9 @@ class Clocks:
         iterate_list = self.sitelist if self.satlist is None else self.satlist
         key = "site" if self.satlist is None else "sat"
 
+        index = self.data.index((key, "series"))
         for sat in iterate_list:
-            reference, comparison = self._find_reference_and_comparison(sat, key)
+            reference, comparison = self._find_reference_and_comparison(sat, key, index)
 
             if reference is not None and comparison is not None:
                 common_time = np.union1d(reference.epoch, comparison.epoch)
@@ -53,8 +54,8 @@ class Clocks:
                     _, unique_indices = np.unique(series.epoch, return_index=True)
                     series.epoch = series.epoch[unique_indices]
                     series.data["x"] = series.data["x"][unique_indices]
-                common_data1[np.isin(common_time, reference.epoch)] = reference.data["x"][:, 0]
-                common_data2[np.isin(common_time, comparison.epoch)] = comparison.data["x"][:, 0]
+                common_data1[np.searchsorted(common_time, reference.epoch)] = reference.data["x"][:, 0]
+                common_data2[np.searchsorted(common_time, comparison.epoch)] = comparison.data["x"][:, 0]
                 data = {}
                 # was initially common_data1 - np.nanmean(common_data1) - common_data2 + np.nanmean(common_data2).
                 # issues with means as Nans are not necessary at the same place.ß
@@ -72,19 +73,21 @@ class Clocks:
         common_time = np.unique(np.concatenate([_result.epoch for _result in result]))
         data = np.full((len(common_time), len(result.arr)), np.nan, dtype="float64")
         for i, _result in enumerate(result):
-            data[np.isin(common_time, _result.epoch), i] = _result.data["x"]
+            data[np.searchsorted(common_time, _result.epoch), i] = _result.data["x"]
         data = np.nanmean(data, axis=1)
         for _result in result:
-            _result.data["x"] -= data[np.isin(common_time, _result.epoch)]
+            _result.data["x"] -= data[np.searchsorted(common_time, _result.epoch)]
 
         return result
 
-    def _find_reference_and_comparison(self, sat, key):
-        reference = None
-        comparison = None
-        for data in self.data:
-            if data.id[key] == sat and data.id["series"] == self.series:
-                comparison = data
-            if data.id[key] == sat and data.id["series"] == self.series_base:
-                reference = data
+    def _find_reference_and_comparison(self, sat, key, index: dict = None):
+        """
+        Last series of the sat (or site) in self.series and in self.series_base.
+
+        :param index: MeasurementArray.index of the data on (key, "series"), built when not given
+        """
+        if index is None:
+            index = self.data.index((key, "series"))
+        comparison = index.get(identifier_key({key: sat, "series": self.series}, (key, "series")), [None])[-1]
+        reference = index.get(identifier_key({key: sat, "series": self.series_base}, (key, "series")), [None])[-1]
         return reference, comparison
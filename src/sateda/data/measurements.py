@@ -25,20 +25,77 @@ Exceptions:
     ValueError: Raised when the input dictionary to the `Measurements` class constructor does not contain any data.
 
 """
+import concurrent.futures
 import datetime
+import itertools
 import logging
-
-import concurrent.futures
+import os
+from multiprocessing import shared_memory
 
 import matplotlib.pyplot as plt
 import numpy as np
 import numpy.typing as npt
 from scipy import stats
 
+from sateda.core.time import TimeArray
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
 
+def identifier_key(identifier: dict, fields: tuple = ("sat", "site")) -> tuple:
+    """
+    Hashable key of the fields of a series identifier, with the values as stripped strings so that e.g. padded
+    site names from different databases match.
+    """
+    return tuple(str(identifier.get(field, "")).strip() for field in fields)
+
+
+def _insert_rows(values: np.ndarray, inserted: np.ndarray, new_values) -> np.ndarray:
+    """
+    Build values with new rows at the positions flagged in inserted, in a single allocation.
+    """
+    dtype = values.dtype if values.dtype.type in (np.str_, np.datetime64, np.object_) else np.result_type(values, 1.0)
+    result = np.empty((len(inserted),) + values.shape[1:], dtype=dtype)
+    result[~inserted] = values
+    result[inserted] = new_values
+    return result
+
+
+def _reshape_ragged(data_dict: dict, reshape_on: str, length: int, identifier: dict) -> dict:
+    """
+    Split the ragged fields of a database document in one series per value of data_dict[reshape_on], e.g. x_0, x_1
+    and x_2 for reshape_on="Num". Each row of a field is aligned with the row of data_dict[reshape_on].
+    The rows are flattened once and all the values scattered at once, rows where a value is missing or repeated
+    are left to NaN.
+
+    :param length: number of epochs
+    :return: dictionary of the series
+    """
+    labels = data_dict[reshape_on]
+    lengths = np.array([len(row) for row in labels], dtype=np.int64)
+    unique, column = np.unique(np.array(list(itertools.chain.from_iterable(labels))), return_inverse=True)
+    column = column.ravel()
+    row = np.repeat(np.arange(len(labels)), lengths)
+    # a value can only be placed if it appears once in its row
+    _cells, first, counts = np.unique(row * len(unique) + column, return_index=True, return_counts=True)
+    single = first[counts == 1]
+    row = row[single]
+    column = column[single]
+    data = {}
+    for key, values in data_dict.items():
+        if key in ["t", "_id", "Epoch", reshape_on]:
+            continue
+        if not np.array_equal([len(value) for value in values], lengths):
+            raise ValueError(f"{key} is not aligned with {reshape_on} for: {identifier}")
+        flat = np.array(list(itertools.chain.from_iterable(values)), dtype="float64")
+        table = np.full((len(unique), length), np.nan)
+        table[column, row] = flat[single]
+        for unique_value, series in zip(unique, table):
+            data[f"{key}_{unique_value}"] = series
+    return data
+
+
 class Measurements:
     """
     A class to represent measurements taken from a satellite.
@@ -73,15 +130,15 @@ class Measurements:
         :param sat: A string representing the ID of the satellite. Default is an empty string.
         :param identifier: A dictionary representing the ID of the measurements. The dictionary should contain a key "sat" with
                   the same value as the sat parameter, and may contain other ID fields. Default is an empty dictionary.
-        :param epoch: A numpy array representing the time of the measurements in seconds since the Unix epoch. Default
-                      is an empty numpy array.
+        :param epoch: A numpy array representing the time of the measurements in seconds since the Unix epoch, or a
+                      TimeArray whose datetime64 buffer is used as is. Default is an empty numpy array.
         :param data: A dictionary representing the data fields of the measurements. The keys of the dictionary should be
                      strings representing the names of the data fields, and the values should be numpy arrays representing
                      the data for each field. Default is an empty dictionary.
         """
         self.sat = sat
         self.id = identifier if identifier is None else identifier
-        self.epoch = epoch
+        self.epoch = epoch.time if isinstance(epoch, TimeArray) else epoch
         self.data = {} if data is None else data
         self.info = {}
         self.subset = slice(None, None, None)
@@ -102,24 +159,11 @@ class Measurements:
         sat = data_dict["_id"]["sat"]
         identifier = data_dict["_id"]
         identifier["db"] = database
-        epoch = np.array([np.datetime64(t) for t in data_dict["t"]])
+        epoch = np.array(data_dict["t"], dtype="datetime64")
         if max(len(value) for key, value in data_dict.items() if key not in ["t", "_id", "Epoch"]) == 0:
             raise ValueError(f"No data for: {identifier}")
         if reshape_on:
-            reshaped = data_dict[reshape_on]
-            unique = np.unique([item for sublist in reshaped for item in sublist])
-            unique = np.sort(unique)
-            data = {}
-            for key in data_dict:
-                if key in ["t", "_id", "Epoch", reshape_on]:
-                    continue
-                for unique_value in unique:
-                    data[f"{key}_{unique_value}"] = np.empty_like((epoch), dtype="float64")
-                    for i, row in enumerate(data_dict[key]):
-                        n = np.asarray(data_dict[reshape_on][i])
-                        index = np.where(n == unique_value)[0]
-                        if len(index) == 1:
-                            data[f"{key}_{unique_value}"][i] = row[index[0]]
+            data = _reshape_ragged(data_dict, reshape_on, len(epoch), identifier)
         else:
             missing_keys = []
             data = {}
@@ -144,38 +188,30 @@ class Measurements:
         find_gaps find the gaps in the epochs vector. A gap is defined as more than 1 seconds between two data point.
         However, if there is only one point in the segment, link it to the closest in time
         """
-        epoch_length = len(self.epoch)
-
-        for i in range(epoch_length - 1):
-            time_diff = (self.epoch[i + 1] - self.epoch[i]) / np.timedelta64(int(delta), "m")
-            if time_diff > 1:
-                self.gaps.append(i)
-
-        for i, gap_index in enumerate(self.gaps[:-1]):
-            if self.gaps[i + 1] - gap_index == 1:
-                next_time_diff = (self.epoch[gap_index + 2] - self.epoch[gap_index + 1]) / np.timedelta64(1, "s")
-                current_time_diff = (self.epoch[gap_index + 1] - self.epoch[gap_index]) / np.timedelta64(1, "s")
-                if next_time_diff < current_time_diff:
-                    self.gaps[i + 1] = None
-                else:
-                    self.gaps[i] = None
-
-        self.gaps = np.array([gap for gap in self.gaps if gap is not None])
-
-        shift = 0
-        for gap_index in self.gaps:
-            gap_index += shift
-            self.epoch = np.insert(
-                self.epoch,
-                gap_index + 1,
-                self.epoch[gap_index] + np.timedelta64(1, "ms"),
-            )
-            for key in self.data:
-                if self.data[key].dtype.type == np.str_:
-                    self.data[key] = np.insert(self.data[key], gap_index + 1, self.data[key][gap_index])
-                else:
-                    self.data[key] = np.insert(self.data[key], gap_index + 1, np.nan)
-            shift += 1
+        time_diff = np.diff(self.epoch)
+        gaps = np.flatnonzero(time_diff / np.timedelta64(int(delta), "m") > 1)
+
+        # a point alone between two gaps is linked to its closest neighbour: the gap on that side is dropped
+        single = np.flatnonzero(np.diff(gaps) == 1)
+        after = gaps[single] + 1
+        closer_to_next = time_diff[after] / np.timedelta64(1, "s") < time_diff[after - 1] / np.timedelta64(1, "s")
+        keep = np.ones(len(gaps), dtype=bool)
+        keep[single + closer_to_next] = False
+        self.gaps = gaps[keep]
+
+        # one NaN row (or a copy of the previous value for strings) after each gap, 1 ms after the last epoch
+        # fields that are not one value per epoch have no row to insert and are left as they are
+        inserted = np.zeros(len(self.epoch) + len(self.gaps), dtype=bool)
+        inserted[self.gaps + 1 + np.arange(len(self.gaps))] = True
+        length = len(self.epoch)
+        self.epoch = _insert_rows(self.epoch, inserted, self.epoch[self.gaps] + np.timedelta64(1, "ms"))
+        for key, value in self.data.items():
+            if len(value) != length:
+                continue
+            if value.dtype.type == np.str_:
+                self.data[key] = _insert_rows(value, inserted, value[self.gaps])
+            else:
+                self.data[key] = _insert_rows(value, inserted, np.nan)
 
     def __sub__(self, other):
         """
@@ -187,7 +223,7 @@ class Measurements:
         :returns: A new Measurements object representing the element-wise difference between this object and the other.
         """
         keys_to_compare = ["sat", "site"]
-        if any(self.id[key] != other.id[key] for key in keys_to_compare):
+        if identifier_key(self.id, keys_to_compare) != identifier_key(other.id, keys_to_compare):
             diffs = ", ".join(
                 [
                     "%(key)s: %(self_id)s <> %(other_id)s"
@@ -236,12 +272,13 @@ class Measurements:
                 return True
         return False
 
-    def demean(self):
+    def demean(self, keys: list = None):
         """
         Remove the mean value from each data field of this Measurements object.
+        :param keys: fields to demean, all by default
         :return None.
         """
-        for key in self.data:
+        for key in self.data if keys is None else keys:
             mean = np.nanmean(self.data[key])
             logger.info(f"Removing mean of data {self.id}: {np.array2string(mean)}")
             self.data[key] -= mean
@@ -292,21 +329,27 @@ class Measurements:
         Print statistics for the data stored in this Measurements object.
         """
         for key in self.data:
-            try:
-                mask = ~np.isnan(self.data[key][self.subset])
-                if key not in self.info:
-                    self.info[key] = {}
-                self.info[key]["mean"] = np.mean(self.data[key][self.subset][mask])
-                self.info[key]["len"] = len(self.data[key][self.subset][mask])
-                self.info[key]["rms"] = np.sqrt(np.mean(self.data[key][self.subset][mask] ** 2))
-                self.info[key]["sumsqr"] = np.sum(self.data[key][self.subset][mask] ** 2)
-                logger.debug(f"{self.id}: {self.info[key]}")
-            except:
-                logger.debug("data not a number")
+            self.get_key_stats(key)
 
-    def compute_qq(self):
+    def get_key_stats(self, key: str) -> None:
+        """
+        Statistics (mean, len, rms, sumsqr) of one field over the subset, stored in self.info[key].
+        """
+        try:
+            mask = ~np.isnan(self.data[key][self.subset])
+            if key not in self.info:
+                self.info[key] = {}
+            self.info[key]["mean"] = np.mean(self.data[key][self.subset][mask])
+            self.info[key]["len"] = len(self.data[key][self.subset][mask])
+            self.info[key]["rms"] = np.sqrt(np.mean(self.data[key][self.subset][mask] ** 2))
+            self.info[key]["sumsqr"] = np.sum(self.data[key][self.subset][mask] ** 2)
+            logger.debug(f"{self.id}: {self.info[key]}")
+        except:
+            logger.debug("data not a number")
+
+    def compute_qq(self, keys: list = None):
         # compute the qq plot
-        for key in self.data:
+        for key in self.data if keys is None else keys:
             mask = ~np.isnan(self.data[key][self.subset])
             if key not in self.info:
                 self.info[key] = {}
@@ -352,12 +395,150 @@ class Measurements:
         return found
 
 
+class MeasurementBlock:
+    """
+    Columnar storage of a list of Measurements: the epochs and every numeric field of all the series are
+    concatenated in one buffer each, series i spanning offsets[i]:offsets[i + 1] (fields missing from a series are
+    NaN there), and ids is the table of the series identifiers.
+
+    The series are given views of the buffers as epoch and data, so they keep working as independent Measurements
+    and in-place changes (e.g. demean) are seen by the block. Fields that are not 1D numbers along the epochs are
+    left in the series only (e.g. strings, integers, 2D arrays).
+    """
+
+    def __init__(self, series: list) -> None:
+        self.series = list(series)
+        self.ids = [data.id for data in self.series]
+        lengths = np.array([len(data.epoch) for data in self.series], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(lengths)])
+        epochs = [np.asarray(data.epoch) for data in self.series if len(data.epoch)]
+        self.epoch = np.concatenate(epochs) if epochs else np.empty(0, dtype="datetime64[us]")
+        self.fields = {}
+        self.present = {}
+        for i, data in enumerate(self.series):
+            start, end = self.offsets[i], self.offsets[i + 1]
+            for key, value in data.data.items():
+                if not _is_column(value, lengths[i]):
+                    continue
+                if key not in self.fields:
+                    self.fields[key] = np.full(self.offsets[-1], np.nan)
+                    self.present[key] = np.zeros(len(self.series), dtype=bool)
+                self.fields[key][start:end] = value
+                self.present[key][i] = True
+        for i, data in enumerate(self.series):
+            data.epoch = self.epoch[self.offsets[i] : self.offsets[i + 1]]
+            for key in data.data:
+                if key in self.present and self.present[key][i]:
+                    data.data[key] = self.fields[key][self.offsets[i] : self.offsets[i + 1]]
+        self._views = [(data.epoch, dict(data.data)) for data in self.series]
+
+    def is_current(self, series: list) -> bool:
+        """
+        True if the block still holds this list of series: same objects, and none of their epoch or data has been
+        replaced since the block was built.
+        """
+        if len(series) != len(self.series):
+            return False
+        for data, own, (epoch, fields) in zip(series, self.series, self._views):
+            if data is not own or data.epoch is not epoch or data.data.keys() != fields.keys():
+                return False
+            if any(data.data[key] is not value for key, value in fields.items()):
+                return False
+        return True
+
+    def other_keys(self, i: int) -> list:
+        """
+        Fields of series i that are not in the columns (the same name can be a column of another series).
+        """
+        return [key for key in self.series[i].data if not (key in self.present and self.present[key][i])]
+
+    def segment_sum(self, values: np.ndarray) -> np.ndarray:
+        """
+        Sum of values (one per row of the buffers) over each series, 0 for empty series.
+        """
+        starts = self.offsets[:-1]
+        nonempty = self.offsets[1:] > starts
+        result = np.zeros(len(self.series), dtype=np.result_type(values, 0.0))
+        if np.any(nonempty):
+            result[nonempty] = np.add.reduceat(values, starts[nonempty])
+        return result
+
+    def segment_index(self) -> np.ndarray:
+        """
+        Index of the series of each row of the buffers.
+        """
+        return np.repeat(np.arange(len(self.series)), np.diff(self.offsets))
+
+    def subset_mask(self) -> np.ndarray:
+        """
+        Rows of the buffers selected by the subset slice of each series.
+        """
+        bounds = np.array(
+            [data.subset.indices(len(data.epoch))[:2] for data in self.series], dtype=np.int64
+        ).reshape(-1, 2)
+        starts = self.offsets[:-1] + bounds[:, 0]
+        ends = self.offsets[:-1] + np.maximum(bounds[:, 1], bounds[:, 0])
+        marks = np.zeros(len(self.epoch) + 1, dtype=np.int64)
+        np.add.at(marks, starts, 1)
+        np.add.at(marks, ends, -1)
+        return np.cumsum(marks[:-1]) > 0
+
+    def first_true(self, condition: np.ndarray) -> np.ndarray:
+        """
+        Index in its series of the first row where condition is True, like np.argmax on each series (0 if never).
+        """
+        rows = np.where(condition, np.arange(len(condition)), len(condition))
+        starts = self.offsets[:-1]
+        nonempty = self.offsets[1:] > starts
+        first = np.full(len(self.series), len(condition))
+        if np.any(nonempty):
+            first[nonempty] = np.minimum.reduceat(rows, starts[nonempty])
+        return np.where(first < self.offsets[1:], first - starts, 0)
+
+    def segment_quantiles(self, values: np.ndarray, valid: np.ndarray, quantiles: np.ndarray) -> tuple:
+        """
+        Quantiles of the valid values of each series, with the linear interpolation of np.quantile.
+
+        :return: (series, len(quantiles)) quantiles and the mask of the series having at least one valid value
+        """
+        values = values[valid]
+        counts = np.bincount(self.segment_index()[valid], minlength=len(self.series))
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        # the selection keeps the series contiguous: sorting them one by one is cheaper than a lexsort of the whole
+        # buffer on (series, value) as soon as the series are long
+        for start, end in zip(starts.tolist(), (starts + counts).tolist()):
+            values[start:end].sort()
+        has_values = counts > 0
+        position = (counts[has_values, np.newaxis] - 1) * quantiles
+        below = np.floor(position)
+        fraction = position - below
+        below = starts[has_values, np.newaxis] + below.astype(np.int64)
+        above = np.minimum(below + 1, (starts + counts - 1)[has_values, np.newaxis])
+        lower, upper = values[below], values[above]
+        # same interpolation as np.quantile, exact at both ends
+        difference = upper - lower
+        result = np.where(fraction >= 0.5, upper - difference * (1 - fraction), lower + difference * fraction)
+        return result, has_values
+
+
+def _is_column(value, length: int) -> bool:
+    value = np.asarray(value)
+    return value.ndim == 1 and len(value) == length and np.issubdtype(value.dtype, np.floating)
+
+
 class MeasurementArray:
     def __init__(self) -> None:
         self.arr = []
         self.tmin = None
         self.tmax = None
         self.difference_check = False
+        self._block = None
+
+    def __getstate__(self):
+        # the columns are shared with the series: a copy of the array rebuilds its own
+        state = self.__dict__.copy()
+        state["_block"] = None
+        return state
 
     def __iter__(self):
         """
@@ -377,25 +558,33 @@ class MeasurementArray:
         :return _type_: _description_
         """
         results = MeasurementArray()
+        index = other.index()
         for data in self.arr:
-            for other_data in other.arr:
-                if data.id["sat"] == other_data.id["sat"] and data.id["site"] == other_data.id["site"]:
-                    logger.debug(
-                        "Matching",
-                        data.id,
-                        other_data.id,
-                        data.id["sat"] == other_data.id["sat"],
-                        data.id["site"] == other_data.id["site"],
-                    )
-                    if self.difference_check:
-                        # QnD fix for the postion difference (if diff > 100m, then it's an old v1 database and we don't do the difference)
-                        if abs(data.data["x_1"][0] - other_data.data["x_1"][0]) > 100:
-                            results.append(data)
-                            break
-                    results.append(data - other_data)
-                    break
+            matches = index.get(identifier_key(data.id))
+            if matches is None:
+                continue
+            other_data = matches[0]
+            logger.debug(f"Matching {data.id} {other_data.id}")
+            if self.difference_check:
+                # QnD fix for the postion difference (if diff > 100m, then it's an old v1 database and we don't do the difference)
+                if abs(data.data["x_1"][0] - other_data.data["x_1"][0]) > 100:
+                    results.append(data)
+                    continue
+            results.append(data - other_data)
         return results
 
+    def index(self, fields: tuple = ("sat", "site")) -> dict:
+        """
+        Index of the series on their identifier (see identifier_key).
+
+        :param fields: identifier fields of the key
+        :return: dictionary of key to the list of matching series, in the order of the array
+        """
+        index = {}
+        for data in self.arr:
+            index.setdefault(identifier_key(data.id, fields), []).append(data)
+        return index
+
     @classmethod
     def from_mongolist(cls, data_lst: list) -> "MeasurementArray":
         """
@@ -416,12 +605,13 @@ class MeasurementArray:
         """
         find_minmax determine the minimum and maximum time of all series in the array
         """
-        try:
-            self.tmin = min(obj.epoch[0] for obj in self.arr)
-            self.tmax = max(obj.epoch[-1] for obj in self.arr)
-        except:
+        block = self.columns()
+        if len(block.series) == 0 or np.any(np.diff(block.offsets) == 0):
             self.tmin = None
             self.tmax = None
+            return
+        self.tmin = block.epoch[block.offsets[:-1]].min()
+        self.tmax = block.epoch[block.offsets[1:] - 1].max()
 
     def sort(self):
         """
@@ -442,8 +632,23 @@ class MeasurementArray:
             tmin = self.tmin + np.timedelta64(minutes_min, "m")
         if minutes_max:
             tmax = self.tmax - np.timedelta64(minutes_max, "m")
-        for data in self.arr:
-            data.select_range(tmin=tmin, tmax=tmax)
+        block = self.columns()
+        # same indices as Measurements.select_range, for all the series at once
+        first = np.zeros(len(block.series), dtype=np.int64) if tmin is None else block.first_true(block.epoch >= tmin)
+        if tmax is None:
+            last = np.diff(block.offsets) - 1
+        else:
+            last = block.first_true(block.epoch > tmax) - 1
+        for data, first_index, last_index in zip(block.series, first.tolist(), last.tolist()):
+            data.subset = slice(first_index, last_index + 1)
+
+    def columns(self) -> MeasurementBlock:
+        """
+        Columnar view of the series (see MeasurementBlock), rebuilt when the series have changed.
+        """
+        if self._block is None or not self._block.is_current(self.arr):
+            self._block = MeasurementBlock(self.arr)
+        return self._block
 
     def append(self, foo_obj: Measurements) -> None:
         """
@@ -473,41 +678,220 @@ class MeasurementArray:
         then generate a common time vector with the unique values of both time vectors,
         and generate a dict of data with nans, fill the values to the corresponding time.
         """
+        index = other.index()
         for _data in self.arr:
-            for _other in other.arr:
-                if _data.id["sat"] == _other.id["sat"] and _data.id["site"] == _other.id["site"]:
-                    common_time = np.union1d(_data.epoch, _other.epoch)
-                    data = {}
-                    for key in set(_data.data) | set(_other.data):
-                        data[key] = np.full_like(common_time, np.nan, dtype="float64")
-                    for name, val in _data.data.items():
+            for _other in index.get(identifier_key(_data.id), []):
+                common_time = np.union1d(_data.epoch, _other.epoch)
+                data = {}
+                for key in set(_data.data) | set(_other.data):
+                    data[key] = np.full_like(common_time, np.nan, dtype="float64")
+                for series in [_data, _other]:
+                    # the epochs are all in the sorted common_time: their position is found by bisection
+                    position = np.searchsorted(common_time, series.epoch)
+                    for name, val in series.data.items():
                         mask = ~np.isnan(val)
-                        data[name][np.isin(common_time, _data.epoch[mask])] = val[mask]
-                    for name, val in _other.data.items():
-                        mask = ~np.isnan(val)
-                        data[name][np.isin(common_time, _other.epoch[mask])] = val[mask]
-                    _data.epoch = common_time
-                    _data.data = data
+                        data[name][position[mask]] = val[mask]
+                _data.epoch = common_time
+                _data.data = data
+
+    def get_stats(self, backend: str = "batched", workers: int = None) -> None:
+        """
+        Statistics of every series, see Measurements.get_stats.
+
+        :param backend: execution backend, one of BACKENDS (see the module benchmark for the trade-offs)
+        :param workers: number of threads or processes, default of concurrent.futures when None
+        """
+        if backend == "batched":
+            self._get_stats_batched()
+        elif backend == "process":
+            self._run_processes("stats", workers)
+        else:
+            _map_series(_series_stats, self.arr, backend, workers)
+
+    def compute_qq(self, backend: str = "batched", workers: int = None) -> None:
+        """
+        Remove the mean of every series and compute their qq plot, see Measurements.compute_qq.
+
+        :param backend: execution backend, one of BACKENDS
+        :param workers: number of threads or processes, default of concurrent.futures when None
+        """
+        if backend == "batched":
+            self._compute_qq_batched()
+        elif backend == "process":
+            self._run_processes("qq", workers)
+        else:
+            _map_series(_series_qq, self.arr, backend, workers)
+
+    def _get_stats_batched(self) -> None:
+        """
+        Statistics of all the series with segmented sums over the columns.
+        """
+        block = self.columns()
+        subset = block.subset_mask()
+        for key, values in block.fields.items():
+            valid = subset & ~np.isnan(values)
+            count = block.segment_sum(valid)
+            total = block.segment_sum(np.where(valid, values, 0.0))
+            sumsqr = block.segment_sum(np.where(valid, values, 0.0) ** 2)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = total / count
+                rms = np.sqrt(sumsqr / count)
+            for i in np.flatnonzero(block.present[key]):
+                info = block.series[i].info.setdefault(key, {})
+                info["mean"] = mean[i]
+                info["len"] = int(count[i])
+                info["rms"] = rms[i]
+                info["sumsqr"] = sumsqr[i]
+        for i, data in enumerate(block.series):
+            for key in block.other_keys(i):
+                data.get_key_stats(key)
+
+    def _compute_qq_batched(self) -> None:
+        """
+        Demean and qq plot of all the series with segmented reductions over the columns.
+        """
+        block = self.columns()
+        subset = block.subset_mask()
+        segment = block.segment_index()
+        levels = np.linspace(0, 1, 100)
+        theoretical_quantiles = stats.norm.ppf(levels)
+        for key, values in block.fields.items():
+            valid = ~np.isnan(values)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = block.segment_sum(np.where(valid, values, 0.0)) / block.segment_sum(valid)
+            for i in np.flatnonzero(block.present[key]):
+                logger.info(f"Removing mean of data {block.ids[i]}: {mean[i]}")
+            values -= mean[segment]
+            quantiles, has_values = block.segment_quantiles(values, subset & valid, levels)
+            for qq, i in zip(quantiles, np.flatnonzero(has_values)):
+                if block.present[key][i]:
+                    block.series[i].info.setdefault(key, {})["qq"] = [qq, theoretical_quantiles]
+        for i, data in enumerate(block.series):
+            _series_qq(data, block.other_keys(i))
+
+    def _run_processes(self, task: str, workers: int = None) -> None:
+        """
+        Run the statistics ("stats") or the qq plots ("qq") of the columns in a pool of processes. The float fields
+        are copied once in shared memory, each process works on a chunk of series and returns their info, which is
+        collected in the order of the series. The other fields are processed here.
+        """
+        block = self.columns()
+        keys = list(block.fields)
+        shape = (len(keys), len(block.epoch))
+        memory = shared_memory.SharedMemory(create=True, size=max(8 * shape[0] * shape[1], 1))
+        try:
+            buffer = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+            for k, key in enumerate(keys):
+                buffer[k] = block.fields[key]
+            series = []
+            for i, data in enumerate(block.series):
+                present = [k for k, key in enumerate(keys) if block.present[key][i]]
+                series.append((i, data.id, block.offsets[i], block.offsets[i + 1], data.subset, present))
+            workers = workers or os.cpu_count()
+            chunks = [series[start :: workers] for start in range(workers)]
+            with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+                results = executor.map(_process_series, [(task, memory.name, shape, keys, chunk) for chunk in chunks])
+                for chunk in results:
+                    for i, info in chunk:
+                        for key, values in info.items():
+                            block.series[i].info.setdefault(key, {}).update(values)
+            if task == "qq":
+                for k, key in enumerate(keys):
+                    block.fields[key][:] = buffer[k]
+        finally:
+            # the views of the shared memory have to be released before closing it
+            buffer = None
+            memory.close()
+            memory.unlink()
+        for i, data in enumerate(block.series):
+            other_keys = block.other_keys(i)
+            if task == "stats":
+                for key in other_keys:
+                    data.get_key_stats(key)
+            else:
+                _series_qq(data, other_keys)
 
-    def get_stats(self) -> None:
-        def get_stats_worker(data):
-            data.get_stats()
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            executor.map(get_stats_worker, self.arr)
+BACKENDS = ("batched", "serial", "thread", "process")
 
-    def compute_qq(self) -> None:
-        def compute_qq_worker(data):
-            data.demean()
-            data.compute_qq()
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            executor.map(compute_qq_worker, self.arr)
+def _map_series(function, series: list, backend: str, workers: int = None) -> list:
+    """
+    Apply function to every series, serially or in a pool of threads. The results are collected in the order of
+    the series, so an exception raised by a series is raised here.
+    """
+    if backend == "serial":
+        return [function(data) for data in series]
+    if backend == "thread":
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            return list(executor.map(function, series))
+    raise ValueError(f"Unknown backend {backend}, expected one of {BACKENDS}")
+
+
+def _series_stats(data: Measurements) -> None:
+    data.get_stats()
 
-    # def get_stats(self) -> None:
-    #     for data in self.arr:
-    #         data.get_stats()
 
-    # def compute_qq(self) -> None:
-    #     for data in self.arr:
-    #         data.compute_qq()
+def _series_qq(data: Measurements, keys: list = None) -> None:
+    """
+    Demean and qq plot of the fields of a series, skipping the fields without numbers.
+    """
+    for key in data.data if keys is None else keys:
+        try:
+            data.demean([key])
+            data.compute_qq([key])
+        except (TypeError, ValueError, IndexError) as err:
+            logger.debug(f"No qq plot for {data.id} {key}: {err}")
+
+
+def _process_series(task: tuple) -> list:
+    """
+    Worker of MeasurementArray._run_processes: statistics or qq plots of a chunk of series whose fields are views
+    of the shared memory buffer.
+
+    :return: list of (series index, info)
+    """
+    kind, name, shape, keys, chunk = task
+    memory = shared_memory.SharedMemory(name=name)
+    try:
+        buffer = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+        results = []
+        for i, identifier, start, end, subset, present in chunk:
+            data = Measurements(identifier=identifier, data={keys[k]: buffer[k, start:end] for k in present})
+            data.subset = subset
+            if kind == "stats":
+                data.get_stats()
+            else:
+                _series_qq(data)
+            results.append((i, data.info))
+    finally:
+        buffer = data = None
+        memory.close()
+    return results
+
+
+if __name__ == "__main__":
+    # Benchmark of the execution backends of MeasurementArray.get_stats and compute_qq. The batched kernel wins
+    # compute_qq at every size and get_stats from about a hundred series, serial being on par for a few long series.
+    # The pools only pay off with several cores and long series, their start-up and the per series Python work
+    # dominate otherwise.
+    import copy
+    import time
+
+    logger.setLevel(logging.WARNING)
+    rng = np.random.default_rng(0)
+    for count, length in [(10, 100), (10, 100000), (100, 3000), (1000, 300), (1000, 3000), (5000, 300)]:
+        array = MeasurementArray()
+        epoch = np.datetime64("2023-01-01", "us") + np.arange(length) * np.timedelta64(30, "s")
+        for i in range(count):
+            data = {key: rng.normal(size=length) for key in ["x", "y", "z"]}
+            array.append(Measurements(identifier={"sat": f"{i}", "site": ""}, epoch=epoch, data=data))
+        timings = []
+        for backend in BACKENDS:
+            copied = copy.deepcopy(array)
+            start = time.perf_counter()
+            copied.get_stats(backend)
+            middle = time.perf_counter()
+            copied.compute_qq(backend)
+            timings.append(f"{backend} {middle - start:.3f}/{time.perf_counter() - middle:.3f}")
+        print(f"{count} series x {length} epochs (get_stats/compute_qq s): " + ", ".join(timings))
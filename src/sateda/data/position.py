@@ -1,10 +1,12 @@
 import datetime
+import functools
 import logging
 
 import matplotlib.pyplot as plt
 import numpy as np
 import numpy.typing as npt
 
+from sateda.core import geodetic
 from sateda.data.measurements import MeasurementArray, Measurements
 
 logger = logging.getLogger(__name__)
@@ -12,34 +14,11 @@ logger.setLevel(logging.INFO)
 
 
 def xyz2blh(x, y, z):
-    """_summary_
-    Angle returned will be in radians
     """
-    A = 6378137.0
-    B = 6356752.314245
-    e = np.sqrt(1 - (B**2) / (A**2))
-    # calculate longitude, in radians
-    longitude = np.arctan2(y, x)
-    # calculate latitude, in radians
-    xy_hypot = np.hypot(x, y)
-    lat0 = np.zeros_like(x)
-    latitude = np.arctan2(z , xy_hypot)
-    while np.any(np.abs(latitude - lat0) > 1e-9):
-        lat0 = latitude
-        N = A / np.sqrt(1 - e**2 * np.sin(lat0) ** 2)
-        latitude = np.arctan2((z + e**2 * N * np.sin(lat0)) , xy_hypot)
-    # calculate height, in meters
-    N = A / np.sqrt(1 - e**2 * np.sin(latitude) ** 2)
-    small_angle_indices = np.abs(latitude) < np.pi / 4
-    R, phi = np.hypot(xy_hypot[small_angle_indices], z[small_angle_indices]), np.arctan(
-        z[small_angle_indices] / xy_hypot[small_angle_indices]
-    )
-    height = np.zeros_like(x)
-    height[small_angle_indices] = R * np.cos(phi) / np.cos(latitude[small_angle_indices]) - N[small_angle_indices]
-    height[~small_angle_indices] = z[~small_angle_indices] / np.sin(latitude[~small_angle_indices]) - N[
-        ~small_angle_indices
-    ] * (1 - e**2)
-    return latitude, longitude, height
+    Geodetic latitude, longitude (radians) and height of cartesian coordinates, see sateda.core.geodetic.xyz2blh.
+    """
+    blh = geodetic.xyz2blh(np.stack(np.broadcast_arrays(x, y, z), axis=-1))
+    return blh[..., 0], blh[..., 1], blh[..., 2]
 
 
 class Position:
@@ -64,29 +43,75 @@ class Position:
 
     def rotate_enu(self) -> None:
         """
-        Rotate the position to the ENU frame from the base
+        Rotate the position to the ENU frame from the base.
+        All the sites are projected with a single product, with one cached rotation per site when its base barely
+        moves (see enu_rotations).
         """
+        bases = {}
+        for base in self.base:
+            # same match as MeasurementArray.locate: the first base of the site
+            bases.setdefault(base.id["site"], base)
+        data_blocks = []
+        rotations = []
+        rotation_index = []
+        first = 0
         for data in self.data:
-            # Locate the base with the same station id
-            base = self.base.locate(site=data.id["site"])
-            _common, in_base, in_data = np.intersect1d(base.epoch, data.epoch, return_indices=True)
-            data.epoch = _common
-            data_matrix = np.column_stack([data.data[f"REC_POS_x_{i}"][in_data] for i in range(3)])
-            base_matrix = np.column_stack([base.data[f"REC_POS_x_{i}"][in_base] for i in range(3)])
-            lat, lon, _height = xyz2blh(base_matrix[:, 0], base_matrix[:, 1], base_matrix[:, 2])
-            rot = np.zeros((3, 3, len(lat)))
-            rot[0, 0] = -np.sin(lon)
-            rot[0, 1] = -np.sin(lat) * np.cos(lon)
-            rot[0, 2] = np.cos(lat) * np.cos(lon)
-            rot[1, 0] = np.cos(lon)
-            rot[1, 1] = -np.sin(lat) * np.sin(lon)
-            rot[1, 2] = np.cos(lat) * np.sin(lon)
-            rot[2, 0] = 0
-            rot[2, 1] = np.cos(lat)
-            rot[2, 2] = np.sin(lat)
-            project = np.matmul(rot.transpose(), data_matrix[:, :, np.newaxis])[:, :, 0]
+            base = bases.get(data.id["site"])
+            if base is None:
+                raise ValueError("Data not found")
+            if np.array_equal(base.epoch, data.epoch):
+                # already aligned by the difference with the base
+                in_base = in_data = np.arange(len(data.epoch))
+            else:
+                _common, in_base, in_data = np.intersect1d(base.epoch, data.epoch, return_indices=True)
+                data.epoch = _common
+            data_blocks.append(np.column_stack([data.data[f"REC_POS_x_{i}"][in_data] for i in range(3)]))
+            rotation = enu_rotations(np.column_stack([base.data[f"REC_POS_x_{i}"][in_base] for i in range(3)]))
+            if len(rotation) == 1:
+                rotation_index.append(np.full(len(in_data), first))
+            else:
+                rotation_index.append(first + np.arange(len(in_data)))
+            rotations.append(rotation)
+            first += len(rotation)
+        if not data_blocks:
+            return
+        rotation = np.concatenate(rotations)[np.concatenate(rotation_index)]
+        project = np.einsum("nij,nj->ni", rotation, np.concatenate(data_blocks))
+        offsets = np.cumsum([0] + [len(block) for block in data_blocks])
+        for data, start, end in zip(self.data, offsets[:-1], offsets[1:]):
             for i in range(3):
-                data.data[f"REC_POS_x_{i}"] = project[:, i]
+                data.data[f"REC_POS_x_{i}"] = project[start:end, i]
+
+
+# base positions of a site within ENU_RESOLUTION (m) of their mean share one rotation: 1 m tilts the frame by less
+# than 2e-7 rad
+ENU_RESOLUTION = 1.0
 
+# number of rounded station positions whose rotation is kept, far more than the sites of a network
+ENU_CACHE_SIZE = 4096
 
 
+@functools.lru_cache(maxsize=ENU_CACHE_SIZE)
+def _enu_rotation(key: tuple) -> np.ndarray:
+    """
+    Read-only ENU rotation (1, 3, 3) of a position rounded to ENU_RESOLUTION, shared by all the callers.
+    """
+    blh = geodetic.xyz2blh(np.array(key, dtype=np.float64)[np.newaxis] * ENU_RESOLUTION)
+    rotation = geodetic.enu_matrices(blh[:, 0], blh[:, 1])
+    rotation.flags.writeable = False
+    return rotation
+
+
+def enu_rotations(positions: np.ndarray) -> np.ndarray:
+    """
+    ENU rotation matrices of the base positions (N, 3) of a site. Station positions barely move: when they are all
+    within ENU_RESOLUTION of their mean, a single read-only matrix (1, 3, 3) of the mean position is returned, cached
+    on the rounded mean position. Otherwise there is one matrix per position (N, 3, 3).
+    """
+    if len(positions) == 0:
+        return np.empty((0, 3, 3))
+    center = positions.mean(axis=0)
+    if np.all(np.abs(positions - center) <= ENU_RESOLUTION):
+        return _enu_rotation(tuple(np.round(center / ENU_RESOLUTION).astype(np.int64).tolist()))
+    blh = geodetic.xyz2blh(positions)
+    return geodetic.enu_matrices(blh[:, 0], blh[:, 1])
@@ -4,10 +4,15 @@ import copy
 import numpy as np
 import numpy.typing as npt
 
+from sateda.core.coordinates import c2t_matrix
+from sateda.core.time import TimeArray, TimeSystem
 from sateda.dbconnector import mongo
 
 logger = logging.getLogger(__name__)
 
+# nominal rotation rate of the Earth (rad/s), IERS conventions
+EARTH_ROTATION_RATE = 7.292115e-5
+
 
 class Satellite:
     def __init__(self, mongodb: mongo.MongoDB = None, sat: str = "", series: str = "") -> None:
@@ -18,6 +23,7 @@ class Satellite:
         self.time: npt.ArrayLike = np.empty(0, dtype="datetime64[us]")
         self.pos: npt.ArrayLike = np.empty(0)
         self.vel: npt.ArrayLike = np.empty(0)
+        self.clk: npt.ArrayLike = np.empty(0)
         self.residual: npt.ArrayLike = np.empty(0)
         self.rac: npt.ArrayLike = np.empty(0)
     
@@ -98,21 +104,119 @@ class Satellite:
         return rms
 
     def get_rac(self):
-        r = self.pos / np.linalg.norm(self.pos, axis=1)[:, np.newaxis]
-        c = np.cross(self.pos, self.vel)
-        c = c / np.linalg.norm(c, axis=1)[:, np.newaxis]
-        a = np.cross(c, self.pos)
-        a = a / np.linalg.norm(a, axis=1)[:, np.newaxis]
-        self.rac = np.empty_like(self.residual)
-        self.rac[:, 0] = (r[:-1:3] * self.residual).sum(axis=1)
-        self.rac[:, 1] = (a[:-1:3] * self.residual).sum(axis=1)
-        self.rac[:, 2] = (c[:-1:3] * self.residual).sum(axis=1)
+        self.rac = rac_projection(self.pos[:-1:3], self.vel[:-1:3], self.residual)
         return self.get_rms(use_rac=True)
 
+    def compare(self, other: "Satellite"):
+        """
+        Difference with another satellite over the same epochs (see align_satellites), e.g. two sp3 files.
+        The position difference is stored in residual, projected on the radial, along track and cross track axes
+        of this satellite (needs vel) in rac, and the clock difference is returned.
+
+        :return: RMS of the RAC differences and clock difference (NaN where a clock is missing)
+        """
+        self.residual = other.pos - self.pos
+        self.rac = rac_projection(self.pos, self.vel, self.residual)
+        clock = other.clk - self.clk if len(self.clk) and len(other.clk) else np.full(len(self.time), np.nan)
+        return self.get_rms(use_rac=True), clock
+
+    def rotation_matrices(self, eop=None, model: str = "iau2006", timesystem: TimeSystem = TimeSystem.GPS):
+        """
+        Celestial to terrestrial rotation matrices (N, 3, 3) at the epochs of the satellite.
+
+        :param eop: sateda.io.eop.EOP to apply polar motion and UT1-UTC, ignored when None
+        :param model: precession-nutation model, "iau2006" or "iau2000"
+        :param timesystem: time system of self.time
+        """
+        time = TimeArray(self.time, timesystem)
+        if eop is not None:
+            return eop.rotation_matrices(time, model)
+        return c2t_matrix(time, model=model)
+
+    def to_eci(self, rotation: np.ndarray = None) -> None:
+        """
+        Rotate pos and vel (if defined) from ECEF to ECI in place.
+
+        :param rotation: celestial to terrestrial matrices (N, 3, 3), computed with rotation_matrices when None
+        """
+        if rotation is None:
+            rotation = self.rotation_matrices()
+        self.pos, vel = ecef_to_eci(rotation, self.pos, self.vel if len(self.vel) == len(self.time) else None)
+        if vel is not None:
+            self.vel = vel
+
+    def to_ecef(self, rotation: np.ndarray = None) -> None:
+        """
+        Rotate pos and vel (if defined) from ECI to ECEF in place, see to_eci.
+        """
+        if rotation is None:
+            rotation = self.rotation_matrices()
+        self.pos, vel = eci_to_ecef(rotation, self.pos, self.vel if len(self.vel) == len(self.time) else None)
+        if vel is not None:
+            self.vel = vel
+
+
+def ecef_to_eci(rotation: np.ndarray, pos: np.ndarray, vel: np.ndarray = None) -> tuple:
+    """
+    Rotate positions and velocities (N, 3) from ECEF to ECI with the celestial to terrestrial matrices (N, 3, 3)
+    (e.g. sateda.core.coordinates.c2t_matrix). The velocities include the rotation of the Earth.
+
+    :return: ECI positions and velocities (None if vel is None)
+    """
+    pos_eci = np.einsum("nji,nj->ni", rotation, pos)
+    if vel is None:
+        return pos_eci, None
+    return pos_eci, np.einsum("nji,nj->ni", rotation, vel + _earth_rotation_velocity(pos))
+
+
+def eci_to_ecef(rotation: np.ndarray, pos: np.ndarray, vel: np.ndarray = None) -> tuple:
+    """
+    Rotate positions and velocities (N, 3) from ECI to ECEF, inverse of ecef_to_eci.
+    """
+    pos_ecef = np.einsum("nij,nj->ni", rotation, pos)
+    if vel is None:
+        return pos_ecef, None
+    return pos_ecef, np.einsum("nij,nj->ni", rotation, vel) - _earth_rotation_velocity(pos_ecef)
+
+
+def _earth_rotation_velocity(pos: np.ndarray) -> np.ndarray:
+    # omega x r with omega along the z axis of the terrestrial frame (polar motion neglected)
+    return EARTH_ROTATION_RATE * np.column_stack([-pos[:, 1], pos[:, 0], np.zeros(len(pos))])
+
+
+def rac_projection(pos: np.ndarray, vel: np.ndarray, residual: np.ndarray) -> np.ndarray:
+    """
+    Project residuals (N, 3) on the radial, along track and cross track axes defined by pos and vel (N, 3).
+    """
+    r = pos / np.linalg.norm(pos, axis=1)[:, np.newaxis]
+    c = np.cross(pos, vel)
+    c = c / np.linalg.norm(c, axis=1)[:, np.newaxis]
+    a = np.cross(c, pos)
+    a = a / np.linalg.norm(a, axis=1)[:, np.newaxis]
+    return np.einsum("nij,nj->ni", np.stack([r, a, c], axis=1), residual)
+
+
 def align_satellites(data1: "Satellite", data2: "Satellite"):
-    common_time, in_sat1, in_sat2 = np.intersect1d(data1.time, data2.time, return_indices=True)
-    data1.time = common_time
-    data2.time = common_time
-    data1.pos = data1.pos[in_sat1]
-    data2.pos = data2.pos[in_sat2]
-    
\ No newline at end of file
+    """
+    Keep the common epochs of two satellites. For a whole file, sateda.io.sp3.align_records joins all the satellites
+    at once.
+    """
+    if _is_increasing(data1.time) and _is_increasing(data2.time):
+        # already sorted (e.g. from sp3 files): no need for intersect1d to sort again
+        position = np.minimum(np.searchsorted(data2.time, data1.time), max(len(data2.time) - 1, 0))
+        found = data2.time[position] == data1.time if len(data2.time) else np.zeros(len(data1.time), dtype=bool)
+        in_sat1 = np.flatnonzero(found)
+        in_sat2 = position[found]
+        common_time = data1.time[in_sat1]
+    else:
+        common_time, in_sat1, in_sat2 = np.intersect1d(data1.time, data2.time, return_indices=True)
+    for data, index in [(data1, in_sat1), (data2, in_sat2)]:
+        for name in ["vel", "clk"]:
+            if len(getattr(data, name)) == len(data.time):
+                setattr(data, name, getattr(data, name)[index])
+        data.time = common_time
+        data.pos = data.pos[index]
+
+
+def _is_increasing(time: np.ndarray) -> bool:
+    return bool(np.all(time[1:] > time[:-1]))
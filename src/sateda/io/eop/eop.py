@@ -6,6 +6,11 @@ import numpy as np
 from scipy.interpolate import lagrange
 from numpy.polynomial.polynomial import Polynomial
 
+from sateda.core.coordinates import c2t_matrix
+from sateda.core.time import TimeArray
+
+ARCSEC_TO_RAD = np.pi / (180 * 3600)
+
 
 class EOP:
     def __init__(self) -> None:
@@ -17,7 +22,8 @@ class EOP:
         self.lod = np.array([])
         self.dX = np.array([])
         self.dY = np.array([])
-        pass
+        # interpolation polynomials of each day, see interpolate
+        self._day_cache = {}
 
     def read_C04(self, filename: str) -> None:
         """
@@ -40,6 +46,111 @@ class EOP:
             self.lod = self.C04[:, 7]
             self.dX = self.C04[:, 8]
             self.dY = self.C04[:, 9]
+            self._day_cache = {}
+
+    def read_finals2000A(self, filename: str) -> None:
+        """
+        read the IERS finals2000A file (Bulletin A values), up to the last day with polar motion.
+        Units are the ones of the C04 files: arcsec for x, y, dX, dY and seconds for UT1-UTC and LOD.
+
+        :param str filename: path to the finals2000A file.
+        """
+        with open(filename, "r") as f:
+            lines = [line.rstrip("\n") for line in f if line[18:27].strip()]
+        chars = np.array(lines, dtype="S185").view("S1").reshape(len(lines), 185)
+
+        def column(start, end, scale=1.0):
+            values = np.char.strip(np.ascontiguousarray(chars[:, start:end]).view(f"S{end - start}")[:, 0])
+            values[np.char.str_len(values) == 0] = b"nan"
+            return values.astype(np.float64) * scale
+
+        self._set_series(
+            column(7, 15),
+            column(18, 27),
+            column(37, 46),
+            column(58, 68),
+            np.nan_to_num(column(79, 86, 1e-3)),
+            np.nan_to_num(column(97, 106, 1e-3)),
+            np.nan_to_num(column(116, 125, 1e-3)),
+        )
+
+    def read_erp(self, filename: str) -> None:
+        """
+        read an IGS ERP (version 2) file: MJD, x and y pole (1e-6 arcsec), UT1-UTC (1e-7 s) and LOD (1e-7 s),
+        the celestial pole offsets are not given and set to 0.
+
+        :param str filename: path to the ERP file.
+        """
+        rows = []
+        with open(filename, "r") as f:
+            for line in f:
+                fields = line.split()
+                try:
+                    mjd = float(fields[0])
+                except (ValueError, IndexError):
+                    continue
+                if len(fields) >= 5 and mjd > 30000:
+                    rows.append([float(field) for field in fields[:5]])
+        data = np.array(rows, dtype=np.float64).reshape(-1, 5)
+        zeros = np.zeros(len(data))
+        self._set_series(
+            data[:, 0], data[:, 1] * 1e-6, data[:, 2] * 1e-6, data[:, 3] * 1e-7, data[:, 4] * 1e-7, zeros, zeros
+        )
+
+    def _set_series(self, mjd, x, y, ut1_utc, lod, dX, dY) -> None:
+        order = np.argsort(mjd, kind="stable")
+        self.mjd, self.x, self.y, self.ut1_utc, self.lod, self.dX, self.dY = (
+            np.asarray(values)[order] for values in (mjd, x, y, ut1_utc, lod, dX, dY)
+        )
+        self._day_cache = {}
+
+    def interpolate(self, mjd: np.ndarray, order: int = 4) -> np.ndarray:
+        """
+        interpolate the EOP variables (x, y, ut1_utc, lod, dX, dY) to an array of mjd with a Lagrange polynomial
+        through the order tabulated values around each day.
+        The polynomials are computed once per day and cached, so later calls for the same days only evaluate them.
+        The epochs outside of the tabulated mjd are not extrapolated, their values are NaN.
+
+        :return: (N, 6) array
+        """
+        mjd = np.atleast_1d(np.asarray(mjd, dtype=np.float64))
+        result = np.full((len(mjd), 6), np.nan)
+        inside = (mjd >= self.mjd[0]) & (mjd <= self.mjd[-1]) if len(self.mjd) else np.zeros(len(mjd), dtype=bool)
+        if not np.any(inside):
+            return result
+        mjd = mjd[inside]
+        # a short series gives a lower order polynomial, for the cache, the fit and the evaluation
+        order = min(order, len(self.mjd))
+        days, inverse = np.unique(np.floor(mjd).astype(np.int64), return_inverse=True)
+        missing = [day for day in days if (order, day) not in self._day_cache]
+        if missing:
+            self._cache_days(np.array(missing), order)
+        coefficients = np.stack([self._day_cache[(order, day)] for day in days])[inverse]
+        # Horner scheme on the offsets from the start of the day
+        offset = (mjd - np.floor(mjd))[:, np.newaxis]
+        values = coefficients[:, -1]
+        for k in range(order - 2, -1, -1):
+            values = values * offset + coefficients[:, k]
+        result[inside] = values
+        return result
+
+    def _cache_days(self, days: np.ndarray, order: int) -> None:
+        # the window of a day is centred on it, and the same for every epoch of the day
+        start = np.clip(np.searchsorted(self.mjd, days + 1) - order // 2, 0, len(self.mjd) - order)
+        index = start[:, np.newaxis] + np.arange(order)
+        vandermonde = (self.mjd[index] - days[:, np.newaxis])[:, :, np.newaxis] ** np.arange(order)
+        values = np.stack([self.x, self.y, self.ut1_utc, self.lod, self.dX, self.dY], axis=1)[index]
+        coefficients = np.linalg.solve(vandermonde, values)
+        for day, coefficient in zip(days, coefficients):
+            self._day_cache[(order, day)] = coefficient
+
+    def rotation_matrices(self, time: TimeArray, model: str = "iau2006", order: int = 4) -> np.ndarray:
+        """
+        celestial to terrestrial rotation matrices (N, 3, 3) of the epochs, with the interpolated polar motion and
+        UT1-UTC, see sateda.core.coordinates.c2t_matrix.
+        """
+        values = self.interpolate(np.sum(time.to_utc().to_mjd(), axis=0), order)
+        return c2t_matrix(time, values[:, 0] * ARCSEC_TO_RAD, values[:, 1] * ARCSEC_TO_RAD, values[:, 2], model)
 
     def interpolate_lagrange(self, mjd: float, degree: int) -> None:
         # interpolate the EOP variables to the given mjd using a polynomial interpolation of degree defined by the user
@@ -1,4 +1,4 @@
-from sateda.io.grace.utils import gracetime_converter, binary_to_int
+from sateda.io.grace.utils import gracetime_converter, binary_to_int, binary_strings_to_int, load_data_lines
 
 
-__all__ = ["gracetime_converter", "binary_to_int"]
+__all__ = ["gracetime_converter", "binary_to_int", "binary_strings_to_int", "load_data_lines"]
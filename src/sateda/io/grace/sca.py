@@ -4,7 +4,7 @@ from typing import Union
 import numpy as np
 import yaml
 
-from sateda.io.grace import gracetime_converter, binary_to_int
+from sateda.io.grace import load_data_lines
 
 sca_dtype = np.dtype(
     [
@@ -35,8 +35,4 @@ class GraceSCA:
         yaml_lines = contents.split("# End of YAML header")[0]
         data_lines = contents.split("# End of YAML header")[1].strip()
         self.yaml_dict = yaml.safe_load(yaml_lines)
-        self.data = np.loadtxt(
-            StringIO(data_lines),
-            dtype=sca_dtype,
-            converters={0: gracetime_converter, 8: binary_to_int},
-        )
+        self.data = load_data_lines(data_lines, sca_dtype)
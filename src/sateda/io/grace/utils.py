@@ -1,9 +1,42 @@
+from io import StringIO
+
 import numpy as np
+import numpy.typing as npt
+
+from sateda.core.time import TimeArray
 
 
 def gracetime_converter(s):
-    return np.datetime64("2000-01-01T12:00:00") + np.timedelta64(int(s), "s")
+    return TimeArray.from_j2000_seconds(float(s)).time[()]
 
 
 def binary_to_int(bin_str):
     return int(bin_str, 2)
+
+
+def binary_strings_to_int(values: npt.ArrayLike) -> np.ndarray:
+    """
+    Convert strings of binary digits ("00000010") to integers, for all the values at once.
+    """
+    values = np.asarray(values, dtype="S")
+    width = values.dtype.itemsize
+    chars = np.char.rjust(values, width, b"0").view(np.uint8).reshape(len(values), width)
+    return (chars == ord("1")).astype(np.int64) @ (1 << np.arange(width - 1, -1, -1, dtype=np.int64))
+
+
+def load_data_lines(data_lines: str, dtype: np.dtype) -> np.ndarray:
+    """
+    Load the data lines of a GRACE-FO file. The time tags (seconds since J2000, first column) and the binary flags
+    (last column) are read as numbers and text, and converted for all the rows at once.
+    """
+    time_name, flag_name = dtype.names[0], dtype.names[-1]
+    raw_dtype = np.dtype(
+        [(time_name, np.float64)] + [(name, dtype[name]) for name in dtype.names[1:-1]] + [(flag_name, "U32")]
+    )
+    raw = np.loadtxt(StringIO(data_lines), dtype=raw_dtype, ndmin=1)
+    data = np.empty(len(raw), dtype=dtype)
+    for name in dtype.names[1:-1]:
+        data[name] = raw[name]
+    data[time_name] = TimeArray.from_j2000_seconds(raw[time_name]).time
+    data[flag_name] = binary_strings_to_int(raw[flag_name])
+    return data
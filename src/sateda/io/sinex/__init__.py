@@ -1,4 +1,4 @@
-from sateda.io.sinex.utils import snx_date_np, snx_np_date, snx_str_datetime
+from sateda.io.sinex.utils import snx_date_np, snx_dates, snx_datetimes, snx_np_date, snx_str_datetime
 
 
-__all__ = ["snx_date_np", "snx_np_date", "snx_str_datetime"]
+__all__ = ["snx_date_np", "snx_dates", "snx_datetimes", "snx_np_date", "snx_str_datetime"]
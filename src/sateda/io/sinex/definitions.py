@@ -1,4 +1,4 @@
-from sateda.io.sinex.utils import trim_string, snx_str_datetime
+from sateda.io.sinex.utils import trim_string, snx_datetimes
 
 
 def _read_sat_identifier(f):
@@ -25,81 +25,80 @@ def _read_sat_identifier(f):
 
 def _read_sat_txpower(f):
     block_data = {}
-    for line in f:
-        if block_edge(line):
-            break
-        if not line.startswith("*"):
-            _svn = trim_string(line[1:5])
-            _startdate = snx_str_datetime(line[5 : 14 + 5])
-            _enddate = snx_str_datetime(line[20 : 14 + 20])
-            _power = float(line[36:41])
-            _comment = trim_string(line[41:])
-            if _svn not in block_data:
-                block_data[_svn] = {}
-            block_data[_svn] = {_startdate: {"endDate": _enddate, "power": _power, "comment": _comment}}
+    lines, startdates, enddates = _read_dated_lines(f, 5, 20)
+    for line, _startdate, _enddate in zip(lines, startdates, enddates):
+        _svn = trim_string(line[1:5])
+        _power = float(line[36:41])
+        _comment = trim_string(line[41:])
+        if _svn not in block_data:
+            block_data[_svn] = {}
+        block_data[_svn] = {_startdate: {"endDate": _enddate, "power": _power, "comment": _comment}}
     return block_data
 
 
 def _read_sat_yaw(f):
     block_data = {}
-    for line in f:
-        if block_edge(line):
-            break
-        if not line.startswith("*"):
-            _svn = trim_string(line[1:5])
-            _startdate = snx_str_datetime(line[5 : 14 + 5])
-            _enddate = snx_str_datetime(line[20 : 14 + 20])
-            _ub = trim_string(line[35 : 6 + 35])
-            _rate = float(line[41 : 41 + 8])
-            _comment = trim_string(line[49:])
-            if _svn not in block_data:
-                block_data[_svn] = {}
-            block_data[_svn] = {
-                _startdate: {
-                    "endDate": _enddate,
-                    "ub": _ub,
-                    "rate": _rate,
-                    "comment": _comment,
-                }
+    lines, startdates, enddates = _read_dated_lines(f, 5, 20)
+    for line, _startdate, _enddate in zip(lines, startdates, enddates):
+        _svn = trim_string(line[1:5])
+        _ub = trim_string(line[35 : 6 + 35])
+        _rate = float(line[41 : 41 + 8])
+        _comment = trim_string(line[49:])
+        if _svn not in block_data:
+            block_data[_svn] = {}
+        block_data[_svn] = {
+            _startdate: {
+                "endDate": _enddate,
+                "ub": _ub,
+                "rate": _rate,
+                "comment": _comment,
             }
+        }
     return block_data
 
 
 def _read_sat_mass(f):
     block_data = {}
-    for line in f:
-        if block_edge(line):
-            break
-        if not line.startswith("*"):
-            # reading...
-            _svn = trim_string(line[1:5])
-            _startdate = snx_str_datetime(line[5 : 14 + 5])
-            _enddate = snx_str_datetime(line[20 : 14 + 20])
-            _mass = float(line[35 : 35 + 9])
-            _comment = trim_string(line[45:])
-            if _svn not in block_data:
-                block_data[_svn] = {}
-            block_data[_svn].update({_startdate: {"endDate": _enddate, "mass": _mass, "comment": _comment}})
+    lines, startdates, enddates = _read_dated_lines(f, 5, 20)
+    for line, _startdate, _enddate in zip(lines, startdates, enddates):
+        # reading...
+        _svn = trim_string(line[1:5])
+        _mass = float(line[35 : 35 + 9])
+        _comment = trim_string(line[45:])
+        if _svn not in block_data:
+            block_data[_svn] = {}
+        block_data[_svn].update({_startdate: {"endDate": _enddate, "mass": _mass, "comment": _comment}})
     return block_data
 
 
 def _read_sat_prn(f):
     block_data = {}
+    lines, startdates, enddates = _read_dated_lines(f, 6, 20)
+    for line, _startdate, _enddate in zip(lines, startdates, enddates):
+        _svn = trim_string(line[1:5])
+        _prn = trim_string(line[35 : 35 + 4])
+        _comment = trim_string(line[39:])
+        if _svn not in block_data:
+            block_data[_svn] = {}
+        block_data[_svn].update(
+            {_startdate: {"startDate": _startdate, "endDate": _enddate, "prn": _prn, "comment": _comment}}
+        )
+    return block_data
+
+
+def _read_dated_lines(f, start_column: int, end_column: int):
+    """
+    Read the data lines of a block up to its end, and convert their start and end dates (YYYY:DOY:SOD) at once.
+    """
+    lines = []
     for line in f:
         if block_edge(line):
             break
         if not line.startswith("*"):
-            _svn = trim_string(line[1:5])
-            _startdate = snx_str_datetime(line[6 : 14 + 6])
-            _enddate = snx_str_datetime(line[20 : 14 + 20])
-            _prn = trim_string(line[35 : 35 + 4])
-            _comment = trim_string(line[39:])
-            if _svn not in block_data:
-                block_data[_svn] = {}
-            block_data[_svn].update(
-                {_startdate: {"startDate": _startdate, "endDate": _enddate, "prn": _prn, "comment": _comment}}
-            )
-    return block_data
+            lines.append(line)
+    startdates = snx_datetimes([line[start_column : 14 + start_column] for line in lines])
+    enddates = snx_datetimes([line[end_column : 14 + end_column] for line in lines])
+    return lines, startdates, enddates
 
 
 def _read_none(f) -> None:
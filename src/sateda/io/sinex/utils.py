@@ -2,34 +2,45 @@ import datetime
 from typing import Union
 
 import numpy as np
+import numpy.typing as npt
+
+from sateda.core.time import TimeArray
+
+
+def snx_dates(values: npt.ArrayLike) -> np.ndarray:
+    """
+    Convert SINEX dates "YYYY:DOY:SOD" to datetime64[s] at once, NaT for the undefined 0000:000:00000.
+    """
+    values = np.char.strip(np.asarray(values, dtype=str))
+    if not values.size:
+        return np.empty(values.shape, dtype="datetime64[s]")
+    year, _, rest = np.moveaxis(np.char.partition(values, ":"), -1, 0)
+    doy, _, sod = np.moveaxis(np.char.partition(rest, ":"), -1, 0)
+    times = TimeArray.from_yds(year.astype(np.int64), doy.astype(np.int64), sod.astype(np.int64))
+    return times.time.astype("datetime64[s]")
+
+
+def snx_datetimes(values: npt.ArrayLike) -> list:
+    """
+    Convert SINEX dates to datetime.datetime at once, None for the undefined dates.
+    """
+    return snx_dates(values).astype(object).tolist()
 
 
 def snx_date_np(s: Union[str, bytes]) -> np.datetime64:
     if isinstance(s, bytes):
         s = s.decode()
-    year, doy, sod = map(int, s.split(":"))
-    if year == 0:  # sinex way to say not defined
-        return np.datetime64("NaT")
-    return np.datetime64(f"{year}-01-01") + np.timedelta64(doy - 1, "D") + np.timedelta64(sod, "s")
+    return snx_dates([s])[0]
 
 
 def snx_str_datetime(s: Union[str, bytes]) -> datetime.datetime:
     if isinstance(s, bytes):
         s = s.decode()
-    year, doy, sod = map(int, s.split(":"))
-    if year == 0:
-        return None
-    return datetime.datetime(year, 1, 1) + datetime.timedelta(days=doy - 1) + datetime.timedelta(seconds=sod)
+    return snx_datetimes([s])[0]
 
 
 def snx_np_date(dt: np.datetime64) -> str:
-    year = dt.astype("datetime64[Y]").astype(int) + 1970
-    year_start = np.datetime64(f"{year}-01-01T00:00:00")
-    days_since_year_start = int(np.floor((dt - year_start).astype("timedelta64[D]").astype(float))) + 1
-    seconds_since_day_start = (
-        (dt - (year_start + np.timedelta64(days_since_year_start - 1, "D"))).astype("timedelta64[s]").astype(int)
-    )
-    return f"{year:04d}:{days_since_year_start:03d}:{seconds_since_day_start:05d}"
+    return str(TimeArray([dt]).format_yds()[0])
 
 
 def snx_datetime_str(dt: datetime.datetime) -> str:
@@ -1,2 +1,4 @@
 from sateda.io.sp3.sp3 import sp3
 from sateda.io.sp3.sp3 import sp3_align
+from sateda.io.sp3.sp3 import align_records
+from sateda.io.sp3.cache import Sp3Cache
@@ -0,0 +1,157 @@
+"""
+On-disk cache of parsed sp3 files.
+
+Every entry is a directory of .npy files (satellites, offsets and the block of records) so the arrays can be
+memory mapped on a hit.
+Entries are keyed on the resolved path, modification time and size of the source file, and the cache is kept
+under a maximum size by evicting the least recently used entries.
+
+The default cache used by sp3.read is configured with the SATEDA_SP3_CACHE (directory) and
+SATEDA_SP3_CACHE_SIZE (bytes) environment variables, or with set_default_cache.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 2 * 1024**3
+
+_COLUMNS = ["satellites", "offsets", "records"]
+
+# bumped when the layout of the stored arrays changes, so older entries are not picked up
+FORMAT_VERSION = 3
+
+
+class Sp3Cache:
+    """
+    Size bounded LRU cache of parsed sp3 files stored as memory-mappable numpy arrays.
+    """
+
+    def __init__(self, directory: Union[str, Path], max_size: int = DEFAULT_MAX_SIZE) -> None:
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, file: Path) -> str:
+        """
+        Key of a file: hash of its resolved path, modification time and size.
+        """
+        file = Path(file).resolve()
+        stat = file.stat()
+        return hashlib.sha1(f"{FORMAT_VERSION}:{file}:{stat.st_mtime_ns}:{stat.st_size}".encode()).hexdigest()
+
+    def load(self, file: Path) -> Optional[dict]:
+        """
+        Return the cached content of the file, or None if not in the cache.
+        The arrays of the returned dictionary are memory mapped.
+        """
+        entry = self.directory / self.key(file)
+        if not entry.is_dir():
+            return None
+        try:
+            with open(entry / "header.json", encoding="utf-8") as f:
+                header = json.load(f)
+            content = {
+                name: np.load(entry / f"{name}.npy", mmap_mode="r")
+                for name in _COLUMNS
+            }
+        except (OSError, ValueError):
+            logger.warning(f"Corrupted sp3 cache entry {entry}, removing it")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        header["start_time"] = np.datetime64(header["start_time"])
+        content["header"] = header
+        # touch the entry to keep track of the last access
+        os.utime(entry)
+        logger.debug(f"sp3 cache hit for {file}")
+        return content
+
+    def store(self, file: Path, content: dict) -> None:
+        """
+        Store the content of a parsed file. content holds the header dictionary and the arrays
+        satellites, offsets and records (see sp3.SP3_DTYPE).
+        """
+        entry = self.directory / self.key(file)
+        temporary = Path(tempfile.mkdtemp(dir=self.directory, prefix=".tmp"))
+        try:
+            header = dict(content["header"])
+            header["start_time"] = str(header["start_time"])
+            with open(temporary / "header.json", "w", encoding="utf-8") as f:
+                json.dump(header, f)
+            for name in _COLUMNS:
+                np.save(temporary / f"{name}.npy", content[name])
+            os.replace(temporary, entry)
+        except OSError:
+            # another process stored the same entry in the meantime
+            logger.debug(f"Could not store {file} in the sp3 cache")
+            shutil.rmtree(temporary, ignore_errors=True)
+        self.evict()
+
+    def size(self) -> int:
+        """
+        Total size in bytes of the cache entries.
+        """
+        return sum(_entry_size(entry) for entry in self._entries())
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache fits in max_size.
+        """
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime_ns)
+        sizes = [_entry_size(entry) for entry in entries]
+        total = sum(sizes)
+        for entry, size in zip(entries, sizes):
+            if total <= self.max_size:
+                break
+            logger.debug(f"Evicting {entry} from the sp3 cache")
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self) -> None:
+        """
+        Remove all entries.
+        """
+        for entry in self._entries():
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def _entries(self):
+        return [entry for entry in self.directory.iterdir() if entry.is_dir() and not entry.name.startswith(".")]
+
+
+def _entry_size(entry: Path) -> int:
+    return sum(f.stat().st_size for f in entry.iterdir())
+
+
+_UNSET = object()
+_default_cache = _UNSET
+
+
+def get_default_cache() -> Optional[Sp3Cache]:
+    """
+    Return the cache used by sp3.read, created from the SATEDA_SP3_CACHE environment variable on first use.
+    """
+    global _default_cache
+    if _default_cache is _UNSET:
+        _default_cache = None
+        if os.environ.get("SATEDA_SP3_CACHE"):
+            _default_cache = Sp3Cache(
+                os.environ["SATEDA_SP3_CACHE"], int(os.environ.get("SATEDA_SP3_CACHE_SIZE", DEFAULT_MAX_SIZE))
+            )
+    return _default_cache
+
+
+def set_default_cache(cache: Optional[Sp3Cache]) -> None:
+    """
+    Set the cache used by sp3.read, None disables it.
+    """
+    global _default_cache
+    _default_cache = cache
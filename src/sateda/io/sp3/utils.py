@@ -0,0 +1,88 @@
+"""
+Fixed-width formatting helpers for the sp3 writer.
+The text is built as (N, width) arrays of ASCII codes so whole columns are formatted at once.
+"""
+
+import numpy as np
+import numpy.typing as npt
+
+_POWERS_OF_TEN = 10 ** np.arange(1, 19, dtype=np.int64)
+
+
+def format_fixed(values: npt.ArrayLike, width: int, decimals: int = 0) -> np.ndarray:
+    """
+    Format numbers right aligned in a fixed-width column, like "%{width}.{decimals}f" (or "%{width}d" when decimals
+    is 0).
+
+    :param values: numbers to format
+    :param width: width of the column
+    :param decimals: number of decimals
+    :raises ValueError: if a value does not fit in the column
+    :return: (N, width) array of ASCII codes
+    """
+    scaled = np.round(np.asarray(values, dtype=np.float64) * 10.0**decimals)
+    negative = scaled < 0
+    remaining = np.abs(scaled).astype(np.int64)
+    text = np.full((len(scaled), width), ord(" "), dtype=np.uint8)
+    column = width - 1
+    for _ in range(decimals):
+        text[:, column] = ord("0") + remaining % 10
+        remaining //= 10
+        column -= 1
+    if decimals:
+        text[:, column] = ord(".")
+        column -= 1
+    # the integer part has at least one digit
+    num_digits = 1 + np.searchsorted(_POWERS_OF_TEN, remaining, side="right")
+    if np.any(num_digits + negative > column + 1):
+        raise ValueError(f"Value too large for a column of width {width}")
+    for digit in range(num_digits.max(initial=1)):
+        written = digit < num_digits
+        text[written, column - digit] = ord("0") + remaining[written] % 10
+        remaining //= 10
+    rows = np.flatnonzero(negative)
+    text[rows, column - num_digits[rows]] = ord("-")
+    return text
+
+
+def format_text(values: npt.ArrayLike, width: int) -> np.ndarray:
+    """
+    Format strings right aligned in a fixed-width column.
+
+    :return: (N, width) array of ASCII codes
+    """
+    values = np.char.rjust(np.asarray(values, dtype=str), width)
+    return np.frombuffer(values.astype(f"S{width}").tobytes(), dtype=np.uint8).reshape(-1, width)
+
+
+def datetime_components(time: npt.ArrayLike) -> tuple:
+    """
+    Split datetime64 values into year, month, day, hour, minute (int arrays) and seconds (float array).
+    """
+    time = np.asarray(time, dtype="datetime64[ns]")
+    years = time.astype("datetime64[Y]")
+    months = time.astype("datetime64[M]")
+    days = time.astype("datetime64[D]")
+    nanoseconds = (time - days).astype(np.int64)
+    return (
+        years.astype(np.int64) + 1970,
+        (months - years).astype(np.int64) + 1,
+        (days - months).astype(np.int64) + 1,
+        nanoseconds // 3_600_000_000_000,
+        nanoseconds // 60_000_000_000 % 60,
+        nanoseconds % 60_000_000_000 / 1e9,
+    )
+
+
+def format_epochs(time: npt.ArrayLike) -> np.ndarray:
+    """
+    Format the sp3 epoch lines "*  yyyy mm dd hh mm ss.ssssssss".
+
+    :return: (N, 31) array of ASCII codes
+    """
+    year, month, day, hour, minute, second = datetime_components(time)
+    columns = [format_text(np.full(len(year), "*"), 1), format_fixed(year, 6)]
+    for value in [month, day, hour, minute]:
+        columns.append(format_fixed(value, 3))
+    columns.append(format_fixed(second, 12, 8))
+    return np.hstack(columns)
@@ -11,7 +11,7 @@ from sklearn.model_selection import train_test_split
 
 from sateda.io.sp3 import sp3, sp3_align
 from sateda.core.transform.helmert import HelmertTransform
-from sateda.data.satellite import Satellite, align_satellites
+from sateda.data.satellite import Satellite
 
 
 logger = logging.getLogger(__name__)
@@ -41,10 +41,18 @@ def parse_args() -> argparse.Namespace:
     args.add_argument("--target", nargs='+', help="Target file(s)", type=str)
     args.add_argument("-v", "--verbose", action="store_true", help="Increase output verbosity")
     args.add_argument("-r", "--rotate", action="store_true", help="Rotate the data")
-    args.add_argument("-o", "--output", help="Output file")
+    args.add_argument("-o", "--output", help="Output sp3 file of the transformed orbits (.gz to compress)")
     args.add_argument("-m", "--mode", help="Mode of fitting, valid option per_sat, per_epoch, all", default="all")
     args.add_argument("-x", '--exclude', nargs='+', help="Exclude satellites", type=str)
     args.add_argument("-c", "--config", help="JSON config file")
+    args.add_argument("-j", "--processes", help="Number of processes used to read the sp3 files", type=int, default=1)
+    args.add_argument(
+        "-i",
+        "--interpolate",
+        help="Interpolate the target at the source epochs with a Lagrange window of this order (0 to disable)",
+        type=int,
+        default=0,
+    )
 
     args = args.parse_args()
     if args.config:
@@ -78,16 +86,19 @@ def run_helmert_transform():
         None
     """
     args = parse_args()
-    data1 = sp3.read_multiple(files=args.src).as_satellites()
-    data2 = sp3.read_multiple(files=args.target).as_satellites()
-    satellite_names = list(set(data1.keys()).intersection(set(data2.keys())))
+    source = sp3.read_multiple(files=args.src, processes=args.processes)
+    target = sp3.read_multiple(files=args.target, processes=args.processes)
+    if args.interpolate:
+        # products with different sampling rates are compared at the epochs of the source
+        target = target.interpolate(np.unique(source.records["time"]), order=args.interpolate)
+    data1, data2 = sp3_align(source, target)
+    data1 = data1.as_satellites()
+    data2 = data2.as_satellites()
+    satellite_names = list(data1.keys())
     print(args)
     if args.exclude:
         for sat in args.exclude:
             satellite_names.remove(sat)
-       
-    for _sat in satellite_names:
-        align_satellites(data1[_sat], data2[_sat])
    
     if args.mode == "persat":
         helmert, transformed = fit_persat(data1, data2, satellite_names)
@@ -110,6 +121,9 @@ def run_helmert_transform():
             f"{data['post_x']: .6f} {data['post_y']: .6f} {data['post_z']: .6f} {data['post_3d']: .6f} "
         )
     logger.info(f" Estimated parameters:\n" f"   T: {helmert}")
+    if args.output:
+        transformed = {name: transformed[name] for name in sorted(satellite_names)}
+        sp3.from_satellites(transformed, header=source.header).write(Path(args.output))
 
 
 def fit_perepoch(data1: dict, data2: dict, satellite_names: List[str]) -> (HelmertTransform, dict):
@@ -130,6 +144,8 @@ def fit_perepoch(data1: dict, data2: dict, satellite_names: List[str]) -> (Helme
     for satellite_name in satellite_names:
         transformed[satellite_name] = data1[satellite_name].copy()
         transformed[satellite_name].pos[:] = np.nan
+        # only the positions are transformed, the velocities of the source would be written with them
+        transformed[satellite_name].vel = np.empty(0)
 
     for time in times:
         data1_ = np.vstack(
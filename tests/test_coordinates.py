@@ -1,8 +1,9 @@
 import unittest
 
+import erfa
 import numpy as np
-from sateda.core.time import Time, TimeSystem
-from sateda.core.coordinates import Eop
+from sateda.core.time import Time, TimeArray, TimeSystem
+from sateda.core.coordinates import Eop, XysCache, c2t_matrix
 
 
 class SofaCoobook(unittest.TestCase):
@@ -50,6 +51,57 @@ class SofaCoobook(unittest.TestCase):
         )
         self.assertTrue(np.allclose(self.eop.rot, expected_rot, rtol=0.0, atol=1e-14))
 
+    def test_iau2000_array(self):
+        """
+        The rotations of a TimeArray are computed at once and match the ones of a single epoch.
+        """
+        self.eop.iau2000()
+        eop = Eop(TimeArray([self.time.time, self.time.time + np.timedelta64(1, "D")], TimeSystem.GPS))
+        eop.xp, eop.yp, eop.ut1_utc = self.eop.xp, self.eop.yp, self.eop.ut1_utc
+        eop.iau2000()
+        self.assertEqual(eop.rot.shape, (2, 3, 3))
+        self.assertTrue(np.allclose(eop.rot[0], self.eop.rot, rtol=0.0, atol=1e-15))
+
+    def test_c2t_matrix(self):
+        """
+        Batched rotations with per-epoch polar motion match the rotation of each epoch.
+        """
+        times = TimeArray(self.time.time + np.arange(3) * np.timedelta64(8, "h"), TimeSystem.GPS)
+        xp = self.eop.xp * np.array([1.0, 1.1, 1.2])
+        rot = c2t_matrix(times, xp, self.eop.yp, self.eop.ut1_utc, model="iau2000")
+        self.assertEqual(rot.shape, (3, 3, 3))
+        for i in range(3):
+            expected = c2t_matrix(Time(times.time[i]), xp[i], self.eop.yp, self.eop.ut1_utc, model="iau2000")
+            self.assertTrue(np.allclose(rot[i], expected, rtol=0.0, atol=1e-15))
+
+    def test_generate_rotation(self):
+        self.eop.iau2006()
+        self.assertTrue(np.allclose(self.eop.generate_rotation(), erfa.c2ixys(self.eop.X, self.eop.Y, self.eop.s)))
+
+    def test_xys_cache(self):
+        """
+        The interpolated X, Y, s give the rotation of the direct series, and the step is refined to the tolerance.
+        """
+        self.eop.iau2006()
+        cache = XysCache("iau2006")
+        eop = Eop(self.time)
+        eop.xp, eop.yp, eop.ut1_utc = self.eop.xp, self.eop.yp, self.eop.ut1_utc
+        eop.iau2006(cache)
+        self.assertAlmostEqual(eop.X, self.eop.X, 15)
+        self.assertTrue(np.allclose(eop.rot, self.eop.rot, rtol=0.0, atol=1e-14))
+
+        cache = XysCache("iau2000", step=4 * 86400, order=4, tolerance=1e-11)
+        x, _, _ = cache.xys(*self.time.to_tt().to_jd())
+        self.assertLess(cache.step, 4 * 86400)
+        self.assertAlmostEqual(x, erfa.xys00a(*self.time.to_tt().to_jd())[0], 11)
+
+        # epochs over several days, not in order
+        jd1 = np.full(5, 2454196.5)
+        jd2 = np.array([2.25, 0.5, 1.75, 0.1, 2.0])
+        cache = XysCache("iau2000")
+        for cached, direct in zip(cache.xys(jd1, jd2), erfa.xys00a(jd1, jd2)):
+            self.assertTrue(np.allclose(cached, direct, rtol=0.0, atol=1e-12))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,99 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from sateda.core.time import TimeArray
+from sateda.io.eop.eop import EOP
+
+
+def finals_line(mjd: float, x: float, y: float, ut1_utc: float, lod: float) -> str:
+    line = [" "] * 185
+    for start, text in [
+        (7, f"{mjd:8.2f}"),
+        (16, "I"),
+        (18, f"{x:9.6f}"),
+        (37, f"{y:9.6f}"),
+        (57, "I"),
+        (58, f"{ut1_utc:10.7f}"),
+        (79, f"{lod:7.4f}"),
+    ]:
+        line[start : start + len(text)] = text
+    return "".join(line).rstrip() + "\n"
+
+
+class TestEop(unittest.TestCase):
+    def setUp(self) -> None:
+        self.days = np.arange(59940.0, 59950.0)
+        # quadratic series, reproduced exactly by the interpolation
+        self.x = 0.07 + 1e-3 * (self.days - 59945) + 1e-5 * (self.days - 59945) ** 2
+        self.directory = tempfile.TemporaryDirectory()
+        self.finals = Path(self.directory.name) / "finals2000A.data"
+        with open(self.finals, "w") as f:
+            for day, x in zip(self.days, self.x):
+                f.write(finals_line(day, x, 0.33, -0.0169, 0.2961))
+            # prediction without polar motion is not read
+            f.write("23 1 1 59950.00 P\n")
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+
+    def test_finals(self):
+        eop = EOP()
+        eop.read_finals2000A(self.finals)
+        self.assertEqual(len(eop.mjd), 10)
+        self.assertAlmostEqual(eop.lod[0], 0.2961e-3)
+        self.assertEqual(eop.dX[0], 0.0)
+
+        mjd = np.array([59945.0, 59945.25, 59946.75])
+        values = eop.interpolate(mjd)
+        self.assertEqual(values.shape, (3, 6))
+        expected = 0.07 + 1e-3 * (mjd - 59945) + 1e-5 * (mjd - 59945) ** 2
+        self.assertTrue(np.allclose(values[:, 0], expected, rtol=0, atol=1e-12))
+        self.assertTrue(np.allclose(values[:, 2], -0.0169))
+        # the days are cached and reused
+        self.assertEqual(len(eop._day_cache), 2)
+        self.assertTrue(np.array_equal(eop.interpolate(mjd[::-1]), values[::-1]))
+
+        # fewer values than the order: the polynomial through all of them
+        short = EOP()
+        short._set_series(*(values[:3] for values in (eop.mjd, eop.x, eop.y, eop.ut1_utc, eop.lod, eop.dX, eop.dY)))
+        mjd = np.array([59940.5, 59941.5])
+        values = short.interpolate(mjd, order=4)
+        expected = 0.07 + 1e-3 * (mjd - 59945) + 1e-5 * (mjd - 59945) ** 2
+        self.assertTrue(np.allclose(values[:, 0], expected, rtol=0, atol=1e-12))
+        self.assertEqual(list(short._day_cache), [(3, 59940), (3, 59941)])
+
+        # the table is not extrapolated, its last epoch is still interpolated
+        values = eop.interpolate(np.array([59939.5, 59949.0, 59949.25]))
+        self.assertTrue(np.all(np.isnan(values[[0, 2]])))
+        self.assertAlmostEqual(values[1, 0], self.x[-1], 12)
+        self.assertTrue(np.all(np.isnan(EOP().interpolate(59945.0))))
+
+    def test_erp(self):
+        erp = Path(self.directory.name) / "igs.erp"
+        erp.write_text(
+            "version 2\n"
+            "  MJD      Xpole   Ypole  UT1-UTC    LOD  Xsig  Ysig   UTsig LODsig  Nr Nf Nt    Xrt    Yrt  Xrtsig  Yrtsig\n"
+            "             10**-6\"        .1us    .1us/d    10**-6\"     .1us  .1us/d                10**-6\"/d    10**-6\"/d\n"
+            "59945.50   75502  329154 -169216   2961    10    10     10     10  100  0  0   -60   1040     10      10\n"
+            "59946.50   75442  330194 -169500   2900    10    10     10     10  100  0  0   -60   1040     10      10\n"
+        )
+        eop = EOP()
+        eop.read_erp(erp)
+        self.assertEqual(eop.mjd.tolist(), [59945.5, 59946.5])
+        self.assertAlmostEqual(eop.x[0], 0.075502)
+        self.assertAlmostEqual(eop.ut1_utc[1], -0.01695)
+
+    def test_rotation_matrices(self):
+        eop = EOP()
+        eop.read_finals2000A(self.finals)
+        time = TimeArray(np.datetime64("2023-01-02T00:00:00", "ns") + np.arange(4) * np.timedelta64(6, "h"))
+        rotation = eop.rotation_matrices(time)
+        self.assertEqual(rotation.shape, (4, 3, 3))
+        self.assertTrue(np.allclose(rotation @ np.swapaxes(rotation, 1, 2), np.eye(3)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+
+import erfa
+import numpy as np
+
+from sateda.core.geodetic import blh2xyz, enu_matrices, xyz2blh
+
+
+class TestGeodetic(unittest.TestCase):
+    def setUp(self) -> None:
+        rng = np.random.default_rng(1)
+        size = 1000
+        self.blh = np.column_stack(
+            [rng.uniform(-np.pi / 2, np.pi / 2, size), rng.uniform(-np.pi, np.pi, size), rng.uniform(-1e3, 1e5, size)]
+        )
+
+    def test_round_trip(self):
+        """
+        blh2xyz and xyz2blh are inverse of each other, and agree with erfa.
+        """
+        xyz = blh2xyz(self.blh)
+        longitude, latitude, height = erfa.gc2gd(1, xyz)
+        self.assertTrue(np.allclose(xyz2blh(xyz), self.blh, rtol=0, atol=1e-8))
+        self.assertTrue(np.allclose(xyz2blh(xyz)[:, 0], latitude, rtol=0, atol=1e-12))
+        self.assertTrue(np.allclose(xyz2blh(xyz)[:, 2], height, rtol=0, atol=1e-6))
+        # in place
+        xyz2blh(xyz, out=xyz)
+        self.assertTrue(np.allclose(xyz, self.blh, rtol=0, atol=1e-8))
+
+    def test_poles(self):
+        blh = xyz2blh([[0.0, 0.0, 6356752.314245 + 10], [0.0, 0.0, -6356752.314245]])
+        self.assertTrue(np.allclose(blh[:, 0], [np.pi / 2, -np.pi / 2]))
+        self.assertTrue(np.allclose(blh[:, 2], [10, 0], atol=1e-6))
+
+    def test_enu_matrices(self):
+        rotation = enu_matrices(self.blh[:, 0], self.blh[:, 1])
+        self.assertTrue(np.allclose(rotation @ rotation.transpose(0, 2, 1), np.eye(3)))
+        # the up axis is the normal to the ellipsoid
+        up = blh2xyz(self.blh + [0, 0, 1]) - blh2xyz(self.blh)
+        self.assertTrue(np.allclose(np.einsum("nij,nj->ni", rotation, up), [0, 0, 1], atol=1e-6))
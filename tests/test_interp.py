@@ -0,0 +1,34 @@
+import unittest
+
+import numpy as np
+
+from sateda.core.interp import lagrange_interpolate, lagrange_weights
+
+
+class TestInterp(unittest.TestCase):
+    def test_polynomial(self):
+        """
+        A window of n points reproduces polynomials of degree n - 1.
+        """
+        grid = np.arange(0.0, 100.0, 5.0)
+        targets = np.array([0.0, 1.5, 47.3, 94.9, 95.0])
+        values = np.column_stack([grid**3 - 2 * grid, np.ones_like(grid)])
+        result = lagrange_interpolate(grid, values, targets, order=4)
+        self.assertTrue(np.allclose(result[:, 0], targets**3 - 2 * targets, rtol=1e-12))
+        self.assertTrue(np.allclose(result[:, 1], 1.0))
+
+    def test_weights(self):
+        """
+        The window is centred on the target, nodes get a unit weight and targets outside of the grid are NaN.
+        """
+        grid = np.arange(10.0)
+        index, weights = lagrange_weights(grid, [4.5, 3.0, 0.2, -1.0], order=4)
+        self.assertEqual(index[0].tolist(), [3, 4, 5, 6])
+        self.assertEqual(index[2].tolist(), [0, 1, 2, 3])
+        self.assertEqual(weights[1].tolist(), [0.0, 0.0, 1.0, 0.0])
+        self.assertTrue(np.allclose(weights[:3].sum(axis=1), 1.0))
+        self.assertTrue(np.all(np.isnan(weights[3])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,12 +1,14 @@
 """
 Testing set for measurements
 """
+import copy
 import datetime
 import unittest
+from multiprocessing import shared_memory
 
 import numpy as np
 
-from sateda.data.measurements import MeasurementArray, Measurements
+from sateda.data.measurements import BACKENDS, MeasurementArray, Measurements, _process_series
 
 
 class TestsMeasurementArray(unittest.TestCase):
@@ -52,6 +54,157 @@ class TestsMeasurementArray(unittest.TestCase):
         res = reference - data
         self.assertEqual(len(res.arr), 1)
 
+    def test_merge(self):
+        """
+        test_merge The series are matched on their stripped sat and site, the data filled on the union of the epochs.
+        """
+        t0 = np.datetime64("2021-01-01T00:00:00", "us")
+        epoch = t0 + np.arange(4) * np.timedelta64(30, "s")
+        array = MeasurementArray()
+        other = MeasurementArray()
+        for site in ["ALIC", "TONG"]:
+            array.append(Measurements(identifier={"sat": "G01", "site": site}, epoch=epoch, data={"x": np.arange(4.0)}))
+        other.append(
+            Measurements(
+                identifier={"sat": "G01", "site": "TONG    "},
+                epoch=epoch[[1, 3]] + np.timedelta64(15, "s"),
+                data={"x": np.array([np.nan, 7.0]), "y": np.array([1.0, 2.0])},
+            )
+        )
+        self.assertEqual(list(array.index()), [("G01", "ALIC"), ("G01", "TONG")])
+        # the difference is done in place in the series of the first array
+        difference = copy.deepcopy(array) - other
+        self.assertEqual(len(difference.arr), 1)
+        self.assertEqual(difference.arr[0].id["site"], "TONG")
+
+        array.merge(other)
+        self.assertEqual(len(array.arr[0].epoch), 4)
+        merged = array.arr[1]
+        self.assertEqual(len(merged.epoch), 6)
+        self.assertTrue(np.array_equal(merged.data["x"], [0, 1, np.nan, 2, 3, 7], equal_nan=True))
+        self.assertTrue(np.array_equal(merged.data["y"], [np.nan, np.nan, 1, np.nan, np.nan, 2], equal_nan=True))
+
+    def test_columns(self):
+        """
+        test_columns The statistics computed over the columns of all series match the ones of each series.
+        """
+        array = MeasurementArray()
+        t0 = np.datetime64("2021-01-01T00:00:00", "us")
+        rng = np.random.default_rng(0)
+        for site, length in [("ALIC", 40), ("TONG", 25), ("EMPT", 0)]:
+            data = {"x": rng.normal(size=length), "name": np.array(["a"] * length)}
+            data["x"][::7] = np.nan
+            if site == "TONG":
+                data["y"] = rng.normal(size=length)
+            epoch = t0 + np.arange(length) * np.timedelta64(60, "s")
+            array.append(Measurements(identifier={"sat": "", "site": site}, epoch=epoch, data=data))
+        array.find_minmax()
+        self.assertIsNone(array.tmin)
+        array.arr.pop()
+        array.find_minmax()
+        self.assertEqual(array.tmax, t0 + np.timedelta64(39, "m"))
+        block = array.columns()
+        self.assertTrue(np.shares_memory(array.arr[1].data["x"], block.fields["x"]))
+        self.assertEqual(block.offsets.tolist(), [0, 40, 65])
+
+        array.adjust_slice(minutes_min=5)
+        self.assertEqual(array.arr[0].subset, slice(5, 40))
+        expected = []
+        for data in array:
+            single = Measurements(identifier=data.id, epoch=data.epoch, data=dict(data.data))
+            single.subset = data.subset
+            single.get_stats()
+            expected.append(single.info)
+        array.get_stats()
+        for data, info in zip(array, expected):
+            for key in ["x", "y"]:
+                if key in data.data:
+                    for stat in ["mean", "len", "rms", "sumsqr"]:
+                        self.assertAlmostEqual(data.info[key][stat], info[key][stat])
+
+        array.compute_qq()
+        subset = array.arr[1].data["y"][array.arr[1].subset]
+        self.assertTrue(np.allclose(array.arr[1].info["y"]["qq"][0], np.quantile(subset, np.linspace(0, 1, 100))))
+        self.assertAlmostEqual(np.nanmean(array.arr[0].data["x"]), 0.0)
+
+        # a copy has its own columns
+        duplicate = copy.deepcopy(array)
+        duplicate.arr[1].data["y"] += 1.0
+        self.assertEqual(duplicate.columns().fields["y"][40], duplicate.arr[1].data["y"][0])
+
+        # replacing the data of a series rebuilds the columns
+        array.arr[0].data["x"] = np.ones(40)
+        self.assertIsNot(array.columns(), block)
+        self.assertEqual(array.columns().fields["x"][0], 1.0)
+
+    def test_backends(self):
+        """
+        test_backends All the execution backends give the same statistics and qq plots, in the order of the series.
+        """
+        rng = np.random.default_rng(1)
+        array = MeasurementArray()
+        epoch = np.datetime64("2021-01-01T00:00:00", "us") + np.arange(50) * np.timedelta64(30, "s")
+        for i in range(7):
+            data = {"x": rng.normal(size=50) + i, "name": np.array(["a"] * 50)}
+            data["x"][i] = np.nan
+            array.append(Measurements(identifier={"sat": f"G0{i}", "site": ""}, epoch=epoch, data=data))
+        array.find_minmax()
+        array.adjust_slice(minutes_min=3)
+        results = {}
+        for backend in BACKENDS:
+            copied = copy.deepcopy(array)
+            copied.get_stats(backend, workers=2)
+            copied.compute_qq(backend, workers=2)
+            results[backend] = copied
+        for backend in BACKENDS:
+            for data, expected in zip(results[backend], results["serial"]):
+                self.assertAlmostEqual(data.info["x"]["mean"], expected.info["x"]["mean"])
+                self.assertEqual(data.info["x"]["len"], expected.info["x"]["len"])
+                self.assertTrue(np.allclose(data.info["x"]["qq"][0], expected.info["x"]["qq"][0]))
+                self.assertTrue(np.allclose(data.data["x"], expected.data["x"], equal_nan=True))
+        self.assertEqual(results["process"].arr[6].info["x"]["len"], 43)
+        with self.assertRaises(ValueError):
+            array.get_stats("gpu")
+
+    def test_process_worker(self):
+        """
+        test_process_worker The worker of the process backend logs the series with their identifier.
+        """
+        values = np.arange(6.0)
+        memory = shared_memory.SharedMemory(create=True, size=values.nbytes)
+        try:
+            np.ndarray(values.shape, dtype=np.float64, buffer=memory.buf)[:] = values
+            chunk = [(0, {"sat": "G01", "site": ""}, 0, 6, slice(None), [0])]
+            with self.assertLogs("sateda.data.measurements", "DEBUG") as logs:
+                results = _process_series(("stats", memory.name, (1, 6), ["x"], chunk))
+        finally:
+            memory.close()
+            memory.unlink()
+        self.assertEqual(results[0][1]["x"]["mean"], 2.5)
+        self.assertIn("'sat': 'G01'", logs.output[0])
+
+    def test_mixed_fields(self):
+        """
+        test_mixed_fields A field that is a column in one series and not in another (integers, other length) gets
+        the same statistics with the batched and the serial backends.
+        """
+        epoch = np.datetime64("2021-01-01T00:00:00", "us") + np.arange(6) * np.timedelta64(30, "s")
+        array = MeasurementArray()
+        for site, x in [("ALIC", np.arange(6.0)), ("TONG", np.arange(6)), ("YAR2", np.arange(4.0))]:
+            array.append(Measurements(identifier={"sat": "", "site": site}, epoch=epoch, data={"x": x}))
+        results = {}
+        for backend in ["batched", "serial"]:
+            copied = copy.deepcopy(array)
+            copied.get_stats(backend)
+            copied.compute_qq(backend)
+            results[backend] = copied
+        for data, expected in zip(results["batched"], results["serial"]):
+            self.assertEqual(data.info["x"].keys(), expected.info["x"].keys())
+            self.assertEqual(data.info["x"]["len"], expected.info["x"]["len"])
+            self.assertAlmostEqual(data.info["x"]["mean"], expected.info["x"]["mean"])
+            if "qq" in expected.info["x"]:
+                self.assertTrue(np.allclose(data.info["x"]["qq"][0], expected.info["x"]["qq"][0]))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -108,3 +108,47 @@ class TestMeasurements(unittest.TestCase):
         meas.find_gaps(delta=1)
         for i in [3, 8, 11]:
             self.assertTrue(np.isnan(meas.data["x"][i]))
+
+    def test_reshape(self):
+        """
+        Test the reshape_on option: one series per value of Num, NaN where the value is missing or repeated.
+        """
+        time_init = datetime.datetime(2021, 1, 1, 0, 0, 0)
+        data_dict = {
+            "_id": {"sat": "", "site": "ALIC"},
+            "t": [time_init + datetime.timedelta(seconds=i) for i in range(4)],
+            "Num": [[0, 1, 2], [2, 0], [1, 1], []],
+            "x": [[1.0, 2.0, 3.0], [6.0, 4.0], [5.0, 5.0], []],
+        }
+        meas = Measurements.from_dictionary(data_dict, reshape_on="Num")
+        self.assertEqual(sorted(meas.data), ["x_0", "x_1", "x_2"])
+        self.assertEqual(meas.epoch.dtype, np.dtype("datetime64[us]"))
+        self.assertTrue(np.array_equal(meas.data["x_0"], [1.0, 4.0, np.nan, np.nan], equal_nan=True))
+        self.assertTrue(np.array_equal(meas.data["x_1"], [2.0, np.nan, np.nan, np.nan], equal_nan=True))
+        self.assertTrue(np.array_equal(meas.data["x_2"], [3.0, 6.0, np.nan, np.nan], equal_nan=True))
+        data_dict["x"][1] = [6.0]
+        with self.assertRaises(ValueError):
+            Measurements.from_dictionary(data_dict, reshape_on="Num")
+
+    def test_find_gaps_single_point(self):
+        """
+        A point alone between two gaps keeps the gap on the side of its closest neighbour, strings are repeated.
+        """
+        time_init = np.datetime64("2021-01-01T00:00:00", "us")
+        seconds = np.array([0, 1, 200, 230, 231, 600, 900, 901])
+        meas = Measurements(epoch=time_init + seconds.astype("timedelta64[s]"))
+        meas.data = {"x": np.arange(8.0), "name": np.array(list("abcdefgh"))}
+        meas.find_gaps(delta=1)
+        # the point at 600 s is closer to 900 s than to 231 s
+        self.assertEqual(meas.gaps.tolist(), [1, 4])
+        self.assertEqual(len(meas.epoch), 10)
+        self.assertTrue(np.array_equal(np.flatnonzero(np.isnan(meas.data["x"])), [2, 6]))
+        self.assertEqual(meas.epoch[2] - meas.epoch[1], np.timedelta64(1, "ms"))
+        self.assertEqual(meas.data["name"][6], "e")
+
+        # a field that is not one value per epoch is left as it is
+        meas = Measurements(epoch=time_init + seconds.astype("timedelta64[s]"))
+        meas.data = {"x": np.arange(8.0), "coefficients": np.arange(3.0)}
+        meas.find_gaps(delta=1)
+        self.assertEqual(len(meas.data["x"]), 10)
+        self.assertTrue(np.array_equal(meas.data["coefficients"], np.arange(3.0)))
@@ -134,3 +134,36 @@ class TestPositions(unittest.TestCase):
         self.assertTrue(np.allclose(pos.data.arr[0].data["REC_POS_x_2"], [0.2, 0.2], atol=1e-15))  # U
         self.assertTrue(np.allclose(pos.data.arr[0].data["REC_POS_x_1"], [0.3, 0.3], atol=1e-15))  # N
         self.assertTrue(np.allclose(pos.data.arr[0].data["REC_POS_x_0"], [-0.1, -0.1], atol=1e-15))  # E
+
+    def test_rotate_sites(self):
+        """
+        test_rotate_enu All the sites are rotated at once, each with its own base, whatever the order of the bases.
+        """
+        reference = MeasurementArray()
+        data = MeasurementArray()
+        time0 = datetime.datetime(2021, 1, 1, 0, 0, 0)
+        epochs = [time0, time0 + datetime.timedelta(seconds=1)]
+        for site, base_position in [("Eq90", [0, 1, 0]), ("Eq0", [1, 0, 0])]:
+            data_dict = {"_id": {"sat": "", "site": site}, "t": epochs}
+            for i, value in enumerate(base_position):
+                data_dict[f"REC_POS_x_{i}"] = [value, value]
+            reference.append(Measurements.from_dictionary(data_dict))
+        for site in ["Eq0", "Eq90"]:
+            data.append(
+                Measurements.from_dictionary(
+                    {
+                        "_id": {"sat": "", "site": site},
+                        "t": epochs,
+                        "REC_POS_x_0": [1.1, 1.1],
+                        "REC_POS_x_1": [1.2, 1.2],
+                        "REC_POS_x_2": [0.3, 0.3],
+                    }
+                )
+            )
+        pos = Position(data=data, base=reference)
+        pos.rotate_enu()
+        self.assertTrue(np.allclose(pos.data.arr[0].data["REC_POS_x_0"], [1.2, 1.2]))  # E
+        self.assertTrue(np.allclose(pos.data.arr[0].data["REC_POS_x_2"], [0.1, 0.1]))  # U
+        self.assertTrue(np.allclose(pos.data.arr[1].data["REC_POS_x_0"], [-1.1, -1.1]))  # E
+        self.assertTrue(np.allclose(pos.data.arr[1].data["REC_POS_x_2"], [0.2, 0.2]))  # U
+        self.assertTrue(np.allclose(pos.data.arr[1].data["REC_POS_x_1"], [0.3, 0.3]))  # N
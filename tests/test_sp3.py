@@ -1,10 +1,16 @@
 import copy
+import gzip
+import os
+import tempfile
 import unittest
 
 from io import StringIO
+from pathlib import Path
 import numpy as np
 
-from sateda.io.sp3.sp3 import sp3
+from sateda.data.satellite import EARTH_ROTATION_RATE, Satellite, ecef_to_eci
+from sateda.io.sp3.cache import Sp3Cache
+from sateda.io.sp3.sp3 import align_records, sp3, sp3_align
 
 input_data = """#dV2007  4 12  0  0  0.00000000     289 ORBIT IGS14 BHN ESOC        
 ## 1422 345600.00000000   900.00000000 54202 0.0000000000000        
@@ -96,6 +102,254 @@ class TestSp3(unittest.TestCase):
         print(self.sp3_data.header)
         self.assertEqual(self.sp3_data.header["nsat"], 2)  # add assertion here
 
+    def test_parse_data_block(self):
+        """
+        Positions are converted to meters, only P records are kept and epochs are shared between satellites.
+        """
+        self.assertEqual(list(self.sp3_data.data), ["G01", "G02"])
+        g01 = self.sp3_data.data["G01"]
+        self.assertEqual(len(g01["x"]), 3)
+        self.assertAlmostEqual(g01["x"][0], -6114801.556, 6)
+        self.assertAlmostEqual(g01["z"][2], 22252168.480, 6)
+        self.assertEqual(g01["time"][1], np.datetime64("2007-04-12T00:15:00"))
+        self.assertTrue(np.all(g01["time"] == self.sp3_data.data["G02"]["time"]))
+
+    def test_irregular_epochs(self):
+        """
+        Epochs not following the interval of the header are parsed from the epoch lines.
+        """
+        irregular = input_data.replace("*  2007  4 12  0 15  0.00000000", "*  2007  4 12  0 20  0.00000000")
+        with self.assertLogs("sateda.io.sp3.sp3", level="DEBUG"):
+            data = sp3.read(StringIO(irregular))
+        expected = np.datetime64("2007-04-12T00:20:00", "ns")
+        self.assertEqual(data.data["G01"]["time"][1], expected)
+        self.assertEqual(self.sp3_data.data["G01"]["time"][1], expected - np.timedelta64(5, "m"))
+
+    def test_records(self):
+        """
+        All satellites share one block of records sorted by satellite and time, indexed by the offsets.
+        """
+        self.assertEqual(self.sp3_data.satellites.tolist(), ["G01", "G02"])
+        self.assertEqual(self.sp3_data.offsets.tolist(), [0, 3, 6])
+        self.assertEqual(self.sp3_data.records["sat"].tolist(), [0, 0, 0, 1, 1, 1])
+        self.assertEqual(self.sp3_data.records["time"].dtype, np.dtype("datetime64[ns]"))
+        self.assertEqual(len(self.sp3_data.epochs), 3)
+        self.assertTrue(np.all(np.isnan(self.sp3_data.records["clk"])))
+        satellites = self.sp3_data.as_satellites()
+        self.assertEqual(satellites["G02"].pos.shape, (3, 3))
+        self.assertTrue(np.shares_memory(satellites["G02"].pos, self.sp3_data.records))
+        self.assertEqual(satellites["G02"].pos[1, 2], self.sp3_data.data["G02"]["z"][1])
+
+    def test_iter_epochs(self):
+        """
+        Streaming the file chunk by chunk gives back the same data as reading it at once.
+        """
+        chunks = list(sp3.iter_epochs(StringIO(input_data)))
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(chunks[0].header["nsat"], 2)
+        self.assertEqual(len(chunks[1].data["G01"]["x"]), 1)
+        self.assertEqual(chunks[1].data["G01"]["time"][0], self.sp3_data.data["G01"]["time"][1])
+
+        chunks = list(sp3.iter_epochs(StringIO(input_data), epochs_per_chunk=2))
+        self.assertEqual([len(chunk.data["G02"]["x"]) for chunk in chunks], [2, 1])
+
+    def test_iter_epochs_gzip(self):
+        """
+        Compressed files are streamed as well.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "test.sp3.gz"
+            with gzip.open(path, "wt") as f:
+                f.write(input_data)
+            merged = sp3()
+            for chunk in sp3.iter_epochs(path):
+                merged.merge(chunk)
+        for label in ["x", "y", "z"]:
+            self.assertTrue(np.all(merged.data["G02"][label] == self.sp3_data.data["G02"][label]))
+
+    def test_read_multiple(self):
+        """
+        Reading several files, serially or in a process pool, merges them once and drops the duplicated epochs.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            files = []
+            for i, content in enumerate([input_data, input_data2, input_data]):
+                files.append(Path(directory) / f"test{i}.sp3")
+                files[-1].write_text(content)
+            serial = sp3.read_multiple(files)
+            parallel = sp3.read_multiple(files, processes=2)
+        for merged in [serial, parallel]:
+            self.assertEqual(len(merged.data["G01"]["time"]), 6)
+            self.assertTrue(np.all(merged.data["G01"]["time"][:-1] < merged.data["G01"]["time"][1:]))
+            self.assertTrue(np.all(merged.data["G02"]["x"][3:] == self.sp3_data.data["G02"]["x"]))
+            self.assertTrue(np.all(merged.data["G02"]["x"][:3] == self.sp3_data2.data["G02"]["x"]))
+
+    def test_cache(self):
+        """
+        A second read of the same file comes from the cache, memory mapped, with the same content.
+        Once the cache is full, the least recently used entry is evicted.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            files = [Path(directory) / "test1.sp3", Path(directory) / "test2.sp3"]
+            files[0].write_text(input_data)
+            files[1].write_text(input_data2)
+            cache = Sp3Cache(Path(directory) / "cache")
+            first = sp3.read(files[0], cache=cache)
+            self.assertIsNotNone(cache.load(files[0]))
+            second = sp3.read(files[0], cache=cache)
+            self.assertIsInstance(second.data["G01"]["x"], np.memmap)
+            self.assertEqual(second.header["nsat"], 2)
+            self.assertEqual(second.header["start_time"], first.header["start_time"])
+            for sat in ["G01", "G02"]:
+                for label in ["time", "x", "y", "z"]:
+                    self.assertTrue(np.all(first.data[sat][label] == second.data[sat][label]))
+
+            cache.max_size = cache.size()
+            os.utime(cache.directory / cache.key(files[0]), ns=(0, 0))
+            sp3.read(files[1], cache=cache)
+            self.assertIsNone(cache.load(files[0]))
+            self.assertIsNotNone(cache.load(files[1]))
+
+    def test_write(self):
+        """
+        Writing a sp3 file and reading it back gives the same data, compressed or not.
+        """
+        buffer = StringIO()
+        self.sp3_data.write(buffer)
+        buffer.seek(0)
+        written = sp3.read(buffer)
+        self.assertEqual(written.header["nsat"], 2)
+        self.assertEqual(written.header["start_time"], self.sp3_data.header["start_time"])
+        self.assertEqual(written.header["epoch_interval"], 900.0)
+        for key in ["gps_week", "gps_seconds_of_week", "mjd", "fractional_day_of_mjd"]:
+            self.assertEqual(written.header[key], self.sp3_data.header[key])
+        for label in ["sat", "time", "x", "y", "z"]:
+            self.assertTrue(np.array_equal(written.records[label], self.sp3_data.records[label]))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "test.sp3.gz"
+            satellites = self.sp3_data.as_satellites()
+            sp3.from_satellites(satellites).write(path)
+            written = sp3.read(path)
+        self.assertTrue(np.all(written.data["G02"]["x"] == self.sp3_data.data["G02"]["x"]))
+        self.assertTrue(np.all(written.data["G02"]["time"] == self.sp3_data.data["G02"]["time"]))
+
+        # an empty satellite has 1-D default arrays, the velocities of the others are still written
+        satellites["G03"] = Satellite(sat="G03")
+        for satellite in satellites.values():
+            satellite.vel = np.ones((len(satellite.time), 3)) if len(satellite.time) else satellite.vel
+        built = sp3.from_satellites(satellites, header=self.sp3_data.header)
+        self.assertEqual(built.satellites.tolist(), ["G01", "G02", "G03"])
+        self.assertEqual(built.offsets.tolist(), self.sp3_data.offsets.tolist() + [self.sp3_data.offsets[-1]])
+        self.assertTrue(np.all(built.records["vx"] == 1))
+        self.assertEqual(built.header["agency"], self.sp3_data.header["agency"])
+
+    def test_velocities(self):
+        """
+        The V lines are parsed with their P line, velocities in m/s.
+        """
+        self.assertEqual(self.sp3_data.records["vx"][0], 2718.4457428)
+        self.assertEqual(self.sp3_data.data["G02"]["vz"][2], 2658.1116225)
+        self.assertTrue(np.all(np.isnan(self.sp3_data.records["vclk"])))
+        satellites = self.sp3_data.as_satellites()
+        self.assertEqual(satellites["G01"].vel.shape, (3, 3))
+        self.assertTrue(np.shares_memory(satellites["G01"].vel, self.sp3_data.records))
+
+    def test_frame_transform(self):
+        """
+        ECEF to ECI and back with one rotation per epoch, the velocity includes the rotation of the Earth.
+        """
+        satellite = copy.deepcopy(self.sp3_data.as_satellites()["G01"])
+        pos, vel = satellite.pos.copy(), satellite.vel.copy()
+        rotation = satellite.rotation_matrices()
+        satellite.to_eci(rotation)
+        self.assertTrue(np.allclose(satellite.pos[1], rotation[1].T @ pos[1]))
+        self.assertTrue(np.allclose(np.linalg.norm(satellite.pos, axis=1), np.linalg.norm(pos, axis=1)))
+        satellite.to_ecef(rotation)
+        self.assertTrue(np.allclose(satellite.pos, pos, rtol=0, atol=1e-6))
+        self.assertTrue(np.allclose(satellite.vel, vel, rtol=0, atol=1e-9))
+
+        # a point fixed on the equator moves at omega * radius in ECI
+        fixed = np.array([[6378137.0, 0.0, 0.0]])
+        _, velocity = ecef_to_eci(rotation[:1], fixed, np.zeros((1, 3)))
+        self.assertAlmostEqual(np.linalg.norm(velocity), EARTH_ROTATION_RATE * 6378137.0, places=6)
+
+    def test_write_accuracy(self):
+        """
+        Clocks, standard deviation exponents and the EP/EV lines are written and read back.
+        """
+        data = copy.deepcopy(self.sp3_data)
+        data.records["clk"] = [12.5, -3.25, np.nan, 1.0, 2.0, 3.0]
+        data.records["sdev"][0] = [10, 11, 12, 113]
+        data.records["ep"][1] = [3, 4, 5, 100, 1234567, -1234567, 0, 0, 0, 0]
+        data.records["ev"][1] = [1, 2, 3, 4, 0, 0, 0, 0, 0, 7654321]
+        buffer = StringIO()
+        data.write(buffer)
+        buffer.seek(0)
+        written = sp3.read(buffer)
+        for label in ["clk", "vx", "vclk", "sdev", "ep", "ev"]:
+            self.assertTrue(np.array_equal(written.records[label], data.records[label], equal_nan=True), label)
+
+    def test_compare(self):
+        """
+        Two files can be compared in RAC without database velocities.
+        """
+        satellites = self.sp3_data.as_satellites()
+        other = copy.deepcopy(self.sp3_data)
+        other.records["x"] += 1.0
+        other.records["clk"] = 0.5
+        other_satellites = other.as_satellites()
+        self.sp3_data.records["clk"] = 0.25
+        rms, clock = satellites["G01"].compare(other_satellites["G01"])
+        self.assertAlmostEqual(rms[3], 1.0)
+        self.assertTrue(np.allclose(np.linalg.norm(satellites["G01"].rac, axis=1), 1.0))
+        self.assertTrue(np.allclose(clock, 0.25))
+
+    def test_align_records(self):
+        """
+        Alignment joins on satellite and epoch, whatever the order of the satellites in the second file.
+        """
+        satellites = self.sp3_data.as_satellites()
+        satellites["G01"].time = satellites["G01"].time[[0, 2]]
+        satellites["G01"].pos = satellites["G01"].pos[[0, 2]]
+        satellites["G03"] = copy.deepcopy(satellites["G02"])
+        other = sp3.from_satellites({name: satellites[name] for name in ["G03", "G02", "G01"]})
+        names, index1, index2, offsets = align_records(self.sp3_data, other)
+        self.assertEqual(names.tolist(), ["G01", "G02"])
+        self.assertEqual(index1.tolist(), [0, 2, 3, 4, 5])
+        self.assertEqual(index2.tolist(), [6, 7, 3, 4, 5])
+        self.assertEqual(offsets.tolist(), [0, 2, 5])
+
+        aligned1, aligned2 = sp3_align(self.sp3_data, other)
+        self.assertEqual(aligned2.satellites.tolist(), ["G01", "G02"])
+        for label in ["time", "x", "y", "z"]:
+            self.assertTrue(np.array_equal(aligned1.records[label], aligned2.records[label]))
+        aligned1, _ = sp3_align(self.sp3_data, self.sp3_data)
+        self.assertTrue(np.shares_memory(aligned1.records, self.sp3_data.records))
+
+        # a satellite without records is dropped, the others are renumbered
+        empty = Satellite(sat="G00")
+        empty.pos = empty.vel = np.empty((0, 3))
+        satellites = self.sp3_data.as_satellites()
+        other = sp3.from_satellites({"G00": empty, "G01": satellites["G01"], "G02": satellites["G02"]})
+        _, aligned2 = sp3_align(self.sp3_data, other)
+        self.assertEqual(aligned2.satellites.tolist(), ["G01", "G02"])
+        self.assertEqual(aligned2.offsets.tolist(), self.sp3_data.offsets.tolist())
+        self.assertTrue(np.array_equal(aligned2.records["sat"], self.sp3_data.records["sat"]))
+
+    def test_interpolate(self):
+        """
+        Interpolation keeps the values at the epochs of the file and drops the times outside of it.
+        """
+        start = self.sp3_data.header["start_time"]
+        times = start + np.arange(-1, 4) * np.timedelta64(450, "s")
+        interpolated = self.sp3_data.interpolate(times, order=3)
+        self.assertEqual(interpolated.offsets.tolist(), [0, 4, 8])
+        self.assertEqual(interpolated.data["G01"]["x"][2], self.sp3_data.data["G01"]["x"][1])
+        # the quadratic through the three epochs
+        x = self.sp3_data.data["G02"]["x"]
+        self.assertAlmostEqual(interpolated.data["G02"]["x"][1], (3 * x[0] + 6 * x[1] - x[2]) / 8)
+
     def test_merge1(self):
         """
         Testing the merge functions.
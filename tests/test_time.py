@@ -1,8 +1,10 @@
+import tempfile
 import unittest
+from pathlib import Path
 
 import numpy as np
 
-from sateda.core.time import Time
+from sateda.core.time import LeapSecondTable, Time, TimeArray, TimeSystem
 
 
 class TestTime(unittest.TestCase):
@@ -22,6 +24,111 @@ class TestTime(unittest.TestCase):
         self.assertTrue(self.time.to_tt().time == np.datetime64("2007-01-01T00:00:51.1840000"))
         self.assertTrue(self.time.to_tai().time == np.datetime64("2007-01-01T00:00:19.0000000"))
 
+    def test_memoized(self) -> None:
+        """
+        Conversions are computed once, and again when the time changes.
+        """
+        tt = self.time.to_tt()
+        self.assertIs(tt._cache, self.time.to_tt()._cache)
+        # the caller gets its own object
+        tt.time += np.timedelta64(1, "h")
+        self.assertEqual(self.time.to_tt().time, np.datetime64("2007-01-01T00:00:51.184"))
+        self.assertEqual(self.time.to_mjd(), (54101.0, 0.0))
+        self.time.time += np.timedelta64(6, "h")
+        self.assertEqual(self.time.to_mjd(), (54101.0, 0.25))
+        self.assertEqual(self.time.to_tt().time, np.datetime64("2007-01-01T06:00:51.184"))
+
+
+class TestTimeArray(unittest.TestCase):
+    def setUp(self) -> None:
+        self.time = TimeArray(
+            np.datetime64("2007-01-01T00:00:00", "ns") + np.arange(3) * np.timedelta64(12, "h"), TimeSystem.GPS
+        )
+
+    def test_time_system(self) -> None:
+        """
+        Same conversions as Time, for the whole array.
+        """
+        self.assertEqual(self.time.to_utc().time[0], np.datetime64("2006-12-31T23:59:46"))
+        self.assertEqual(self.time.to_tt().time[2], np.datetime64("2007-01-02T00:00:51.184"))
+        self.assertEqual(self.time.to_tai().timesystem, TimeSystem.TAI)
+        self.assertTrue(np.all(self.time.to_tt().to_utc().to_gps().time == self.time.time))
+        self.assertTrue(np.all(self.time == self.time.to_utc()))
+
+    def test_mjd(self) -> None:
+        mjd, fraction = self.time.to_mjd()
+        self.assertEqual(mjd.tolist(), [54101.0, 54101.0, 54102.0])
+        self.assertEqual(fraction.tolist(), [0.0, 0.5, 0.0])
+        scalar = Time.from_components(2007, 1, 1, 12, 0, 0, 0)
+        self.assertEqual(self.time[1:2].to_tt().to_jd()[1][0], scalar.to_tt().to_jd()[1])
+        self.assertFalse(self.time.to_jd()[1].flags.writeable)
+        self.assertFalse(self.time.to_utc().time.flags.writeable)
+        utc = self.time.to_utc()
+        utc.time = utc.time + np.timedelta64(1, "s")
+        self.assertEqual(self.time.to_utc().time[0], np.datetime64("2006-12-31T23:59:46"))
+
+    def test_same_system(self) -> None:
+        """
+        A conversion to the time system of the array does not make the array or its source read-only.
+        """
+        for timesystem in [TimeSystem.GPS, TimeSystem.TAI, TimeSystem.TT, TimeSystem.UTC]:
+            source = np.datetime64("2007-01-01T00:00:00", "ns") + np.arange(3) * np.timedelta64(12, "h")
+            array = TimeArray(source, timesystem)
+            self.assertTrue(np.array_equal(array.to_system(timesystem).time, source))
+            array.to_gps(), array.to_tai(), array.to_tt(), array.to_utc()
+            array.time[0] += np.timedelta64(1, "s")
+            source[1] += np.timedelta64(1, "s")
+            self.assertTrue(array.time.flags.writeable)
+
+    def test_calendar(self) -> None:
+        """
+        GPS week, YYYY:DOY:SOD, J2000 seconds and MJD constructors and formatters.
+        """
+        gps = TimeArray.from_gps_week([1408, 1408], [86400.0, 129600.5])
+        self.assertEqual(gps.time[1], np.datetime64("2007-01-01T12:00:00.5"))
+        self.assertEqual(gps.to_gps_week()[0].tolist(), [1408, 1408])
+        self.assertEqual(gps.to_gps_week()[1].tolist(), [86400.0, 129600.5])
+        yds = TimeArray.from_yds([2007, 0], [1, 0], [43200, 0])
+        self.assertEqual(yds.time[0], gps.time[0] + np.timedelta64(12, "h"))
+        self.assertTrue(np.isnat(yds.time[1]))
+        self.assertEqual(yds.format_yds().tolist(), ["2007:001:43200", "0000:000:00000"])
+        self.assertEqual(TimeArray.from_j2000_seconds([0.25]).time[0], np.datetime64("2000-01-01T12:00:00.25"))
+        self.assertEqual(gps.to_j2000_seconds()[0], 220881600.0)
+        self.assertTrue(np.all(TimeArray.from_mjd(*self.time.to_mjd()).time == self.time.time))
+
+    def test_from_times(self) -> None:
+        times = TimeArray.from_times([Time.from_components(2007, 1, 1), Time.from_components(2007, 1, 1).to_utc()])
+        self.assertEqual(times.timesystem, TimeSystem.GPS)
+        self.assertTrue(np.all(times.time == np.datetime64("2007-01-01T00:00:00")))
+
+
+class TestLeapSeconds(unittest.TestCase):
+    def test_boundary(self) -> None:
+        """
+        UTC conversions use the offset in force at each epoch, across the 2017-01-01 leap second.
+        """
+        gps = TimeArray(np.array(["2016-12-31T23:59:00", "2017-01-01T00:01:00"], dtype="datetime64[ns]"))
+        utc = gps.to_utc()
+        self.assertEqual(utc.time.tolist(), np.array(["2016-12-31T23:58:43", "2017-01-01T00:00:42"], "M8[ns]").tolist())
+        self.assertTrue(np.all(utc.to_gps().time == gps.time))
+        self.assertEqual(Time.from_components(2000, 1, 1).leapsec, 32)
+        utc = Time.from_components(2000, 1, 1, timesystem=TimeSystem.UTC)
+        self.assertEqual(utc.time, np.datetime64("2000-01-01T00:00:13"))
+
+    def test_from_file(self) -> None:
+        """
+        The table can be read from the IERS Leap_Second.dat and from leap-seconds.list.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            iers = Path(directory) / "Leap_Second.dat"
+            iers.write_text("#  MJD        Date        TAI-UTC (s)\n" "   57754.0    1  1 2017       37\n")
+            ntp = Path(directory) / "leap-seconds.list"
+            ntp.write_text("#@	4291747200\n" "3692217600	37	# 1 Jan 2017\n")
+            for file in [iers, ntp]:
+                table = LeapSecondTable.from_file(file)
+                self.assertEqual(table.dates[0], np.datetime64("2017-01-01"))
+                self.assertEqual(table.offsets[0], np.timedelta64(37, "s"))
+
 
 if __name__ == "__main__":
     unittest.main()